@@ -0,0 +1,165 @@
+""" filters.py """
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipy.signal as signal
+
+# A bank entry: FIR taps, or IIR (b, a) coefficients
+FilterSpec = np.ndarray | tuple[np.ndarray, np.ndarray]
+
+
+class MovingAverage:
+    """Streaming _length-point moving average, O(1) work per sample from a running sum.
+
+    Signals run along the last axis; any leading axes are independent channels.
+    The running sum carries over block edges and is re-based to zero every
+    REBASE samples of the stream, so its rounding error stays bounded however
+    long the stream runs. The re-base points are fixed stream positions, so
+    chunked output is bit-identical to one process() call over the whole stream.
+    The filter starts from zeros, as lfilter(ones(_length) / _length, 1, x) does.
+    """
+
+    # Stream samples between re-bases of the running sum
+    REBASE: int = 4096
+
+    def __init__(self, _length: int):
+        self.length: int = _length
+        self._sums: np.ndarray | None = None  # Running sums of the last _length samples
+        self._count: int = 0  # Samples seen since the last re-base
+
+    def reset(self) -> None:
+        self._sums = None
+        self._count = 0
+
+    def process(self, _x: np.ndarray) -> np.ndarray:
+        _x = np.asarray(_x, dtype=np.float64)
+        if self._sums is None:
+            self._sums = np.zeros(_x.shape[:-1] + (self.length,))
+        _out: np.ndarray = np.empty(_x.shape)
+        _start: int = 0
+        while _start < _x.shape[-1]:
+            _stop: int = min(_x.shape[-1], _start + self.REBASE - self._count)
+            # cumsum continued from the previous segment's last running sum
+            _running: np.ndarray = np.cumsum(
+                np.concatenate((self._sums[..., -1:], _x[..., _start:_stop]), axis=-1), axis=-1)[..., 1:]
+            _all: np.ndarray = np.concatenate((self._sums, _running), axis=-1)
+            _out[..., _start:_stop] = (_all[..., self.length:] - _all[..., :-self.length]) / self.length
+            self._sums = _all[..., -self.length:]
+            self._count += _stop - _start
+            if self._count == self.REBASE:
+                # Only differences of the sums matter: shift the last one to zero
+                self._sums = self._sums - self._sums[..., -1:]
+                self._count = 0
+            _start = _stop
+        return _out
+
+
+class IirFilter:
+    """Stateful lfilter(_b, _a): the delay-line state (zi) carries over block edges.
+
+    Signals run along the last axis; any leading axes are independent channels.
+    Chunked output is identical to one lfilter call over the whole stream.
+    """
+
+    def __init__(self, _b: np.ndarray, _a: np.ndarray | float = 1.0):
+        self.b: np.ndarray = np.atleast_1d(np.asarray(_b, dtype=np.float64))
+        self.a: np.ndarray = np.atleast_1d(np.asarray(_a, dtype=np.float64))
+        self.order: int = max(len(self.b), len(self.a)) - 1
+        self._zi: np.ndarray | None = None
+
+    def reset(self) -> None:
+        self._zi = None
+
+    def process(self, _x: np.ndarray) -> np.ndarray:
+        _x = np.asarray(_x)
+        if self.order == 0:
+            return _x * (self.b[0] / self.a[0])
+        if self._zi is None:
+            self._zi = np.zeros(_x.shape[:-1] + (self.order,), dtype=np.result_type(_x, self.b, self.a))
+        _y, self._zi = signal.lfilter(self.b, self.a, _x, axis=-1, zi=self._zi)
+        return _y
+
+
+class FirFilter:
+    """Stateful FIR filter: each block is convolved with the last len(_taps) - 1 input samples in front.
+
+    Signals run along the last axis; any leading axes are independent channels.
+    Every output is the same dot product wherever the block edges fall, so chunked
+    output is bit-identical to one process() call (and equal to lfilter(_taps, 1, x)
+    up to rounding).
+    """
+
+    def __init__(self, _taps: np.ndarray):
+        self.taps: np.ndarray = np.atleast_1d(np.asarray(_taps, dtype=np.float64))
+        self._history: np.ndarray | None = None  # Last len(taps) - 1 input samples
+
+    def reset(self) -> None:
+        self._history = None
+
+    def process(self, _x: np.ndarray) -> np.ndarray:
+        _x = np.asarray(_x)
+        if self._history is None:
+            self._history = np.zeros(_x.shape[:-1] + (len(self.taps) - 1,), dtype=np.result_type(_x, self.taps))
+        if _x.shape[-1] == 0:
+            return _x.astype(self._history.dtype)
+        _ext: np.ndarray = np.concatenate((self._history, _x), axis=-1)
+        self._history = _ext[..., _ext.shape[-1] - (len(self.taps) - 1):]
+        _flat: np.ndarray = _ext.reshape(-1, _ext.shape[-1])
+        _y: np.ndarray = np.array([np.convolve(_channel, self.taps, 'valid') for _channel in _flat])
+        return _y.reshape(_x.shape[:-1] + (_y.shape[-1],))
+
+
+class SosFilter:
+    """Stateful sosfilt over second-order sections, the numerically safe form for high-order IIR filters.
+
+    Signals run along the last axis; chunked output is identical to one sosfilt call.
+    """
+
+    def __init__(self, _sos: np.ndarray):
+        self.sos: np.ndarray = np.atleast_2d(np.asarray(_sos, dtype=np.float64))
+        self._zi: np.ndarray | None = None
+
+    def reset(self) -> None:
+        self._zi = None
+
+    def process(self, _x: np.ndarray) -> np.ndarray:
+        _x = np.asarray(_x)
+        if self._zi is None:
+            self._zi = np.zeros((len(self.sos),) + _x.shape[:-1] + (2,), dtype=np.result_type(_x, self.sos))
+        _y, self._zi = signal.sosfilt(self.sos, _x, axis=-1, zi=self._zi)
+        return _y
+
+
+def filter_bank(_bank: list[FilterSpec], _x: np.ndarray, _workers: int = 1, _rows_per_task: int = 256) -> np.ndarray:
+    """Every filter of _bank over every signal of _x along its last axis -> (n_filters, *_x.shape).
+
+    One lfilter call per filter covers all signals at once. With _workers > 1 the
+    work is split into (filter, _rows_per_task signals) tasks on a thread pool
+    (lfilter releases the GIL), so large sweeps use every core; the output is the
+    same either way.
+    """
+    _x = np.asarray(_x)
+    _coefficients: list[tuple[np.ndarray, np.ndarray]] = [
+        (np.atleast_1d(_spec[0]), np.atleast_1d(_spec[1])) if isinstance(_spec, tuple)
+        else (np.atleast_1d(_spec), np.ones(1)) for _spec in _bank]
+    _dtype: np.dtype = np.result_type(_x, *[_c for _pair in _coefficients for _c in _pair], np.float64)
+    _out: np.ndarray = np.empty((len(_bank),) + _x.shape, dtype=_dtype)
+    _rows: np.ndarray = _x.reshape(-1, _x.shape[-1]) if _x.ndim > 1 else _x[None]
+    _out_rows: np.ndarray = _out.reshape(len(_bank), -1, _x.shape[-1])
+    if _workers <= 1:
+        _rows_per_task = max(1, len(_rows))
+
+    def _run(_task: tuple[int, int]) -> None:
+        _i, _r0 = _task
+        _b, _a = _coefficients[_i]
+        _out_rows[_i, _r0:_r0 + _rows_per_task] = signal.lfilter(_b, _a, _rows[_r0:_r0 + _rows_per_task], axis=-1)
+
+    _tasks: list[tuple[int, int]] = [(_i, _r0) for _i in range(len(_bank)) for _r0 in range(0, len(_rows), _rows_per_task)]
+    if _workers > 1:
+        with ThreadPoolExecutor(_workers) as _pool:
+            list(_pool.map(_run, _tasks))
+    else:
+        for _task in _tasks:
+            _run(_task)
+    return _out
@@ -0,0 +1,80 @@
+""" fir_design.py """
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import get_window
+
+FIR_KINDS: tuple[str, ...] = ('lowpass', 'highpass', 'bandpass', 'bandstop')
+
+# A cutoff: one edge (Hz) for low/high-pass, (low, high) edges for band-pass/-stop
+Cutoff = float | tuple[float, float]
+
+
+@lru_cache(maxsize=32)
+def fir_window(_length: int, _window: str = 'blackman') -> np.ndarray:
+    """Symmetric _length-point window (as windows.blackman(L) etc.), cached read-only per (length, window)."""
+    _w: np.ndarray = get_window(_window, _length, fftbins=False)
+    _w.flags.writeable = False
+    return _w
+
+
+def _lowpass_bank(_length: int, _edges: np.ndarray, _fs: float, _window: str) -> np.ndarray:
+    # Ideal low-pass h(n) = 2 fc / fs * sinc(2 fc / fs * n) around the centre tap, one row per edge
+    _n: np.ndarray = np.arange(_length) - (_length - 1) / 2
+    _nu: np.ndarray = 2 * np.asarray(_edges, dtype=np.float64)[..., None] / _fs
+    return _nu * np.sinc(_nu * _n) * fir_window(_length, _window)
+
+
+def design_fir_bank(_length: int,
+                    _cutoffs: np.ndarray,
+                    _fs: float = 2.0,
+                    _kind: str = 'lowpass',
+                    _window: str = 'blackman') -> np.ndarray:
+    """Windowed-sinc taps for a whole vector of cutoffs at once -> (n_cutoffs, _length).
+
+    _cutoffs holds one edge per filter for 'lowpass' / 'highpass' and a (low, high)
+    pair per filter for 'bandpass' / 'bandstop'. The taps are the ideal response in
+    closed form times the window, so the whole sweep is a handful of array
+    operations. High-pass and band-stop are the centre impulse minus the pass
+    response, which needs an odd _length.
+    """
+    if _kind not in FIR_KINDS:
+        raise ValueError(f"Unknown filter kind {_kind!r}: use one of {FIR_KINDS}.")
+    if _kind in ('highpass', 'bandstop') and _length % 2 == 0:
+        raise ValueError(f"A {_kind} FIR needs an odd length (got {_length}).")
+    _cutoffs = np.asarray(_cutoffs, dtype=np.float64)
+    _band: bool = _kind in ('bandpass', 'bandstop')
+    if _band and _cutoffs.shape[-1:] != (2,):
+        raise ValueError(f"A {_kind} FIR needs (low, high) cutoff pairs.")
+    # A single cutoff (or pair) is a sweep of one: the taps are always (n_cutoffs, _length)
+    _cutoffs = _cutoffs.reshape(-1, 2) if _band else _cutoffs.reshape(-1)
+    if np.any(_cutoffs < 0) or np.any(_cutoffs > _fs / 2):
+        raise ValueError(f"Cutoffs must lie in [0, fs / 2] = [0, {_fs / 2}] Hz.")
+
+    if _band:
+        _taps: np.ndarray = (_lowpass_bank(_length, _cutoffs[..., 1], _fs, _window)
+                             - _lowpass_bank(_length, _cutoffs[..., 0], _fs, _window))
+    else:
+        _taps = _lowpass_bank(_length, _cutoffs, _fs, _window)
+    if _kind in ('highpass', 'bandstop'):
+        _taps = -_taps
+        _taps[..., _length // 2] += fir_window(_length, _window)[_length // 2]
+    return _taps
+
+
+@lru_cache(maxsize=256)
+def _design_fir(_length: int, _cutoff: Cutoff, _fs: float, _kind: str, _window: str) -> np.ndarray:
+    _taps: np.ndarray = design_fir_bank(_length, np.asarray(_cutoff), _fs, _kind, _window)[0]
+    _taps.flags.writeable = False
+    return _taps
+
+
+def design_fir(_length: int,
+               _cutoff: Cutoff,
+               _fs: float = 2.0,
+               _kind: str = 'lowpass',
+               _window: str = 'blackman') -> np.ndarray:
+    """_length windowed-sinc taps of one filter, cached read-only per (length, cutoff, fs, kind, window)."""
+    _key: Cutoff = tuple(float(_edge) for _edge in _cutoff) if np.ndim(_cutoff) else float(_cutoff)
+    return _design_fir(int(_length), _key, float(_fs), _kind, _window)
@@ -0,0 +1,136 @@
+""" freq_response.py """
+
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.fft as sfft
+
+from filters import FilterSpec
+from spectrum import band_mask
+
+# A band edge pair in Hz: (low, high)
+Band = tuple[float, float]
+
+
+def frequency_grid(_n_points: int = 512, _fs: float = 2.0) -> np.ndarray:
+    """_n_points frequencies from 0 up to (not including) fs / 2: the grid of freqz(..., worN=_n_points, fs=_fs)."""
+    return np.arange(_n_points) * (_fs / (2 * _n_points))
+
+
+# Polynomials up to this many coefficients are summed directly on the grid instead of through an rfft
+DIRECT_TERMS: int = 8
+
+
+def _polynomial_response(_coefficients: np.ndarray, _n_points: int) -> np.ndarray:
+    _length: int = _coefficients.shape[-1]
+    if _length <= DIRECT_TERMS:
+        # Biquads and short polynomials: a (terms x grid) matrix of z^-k is cheaper than a 2n-point rfft
+        _powers: np.ndarray = np.exp(-1j * np.pi * np.outer(np.arange(_length), np.arange(_n_points)) / _n_points)
+        return _coefficients @ _powers
+    # Polynomial in z^-1 on the grid: rfft of 2 n (or a multiple covering every coefficient) points, every m-th bin
+    _m: int = max(1, -(-_length // (2 * _n_points)))
+    _spectrum: np.ndarray = sfft.rfft(_coefficients, 2 * _n_points * _m, axis=-1)
+    return _spectrum[..., :_n_points * _m:_m]
+
+
+def fir_response(_taps: np.ndarray, _n_points: int = 512, _fs: float = 2.0) -> tuple[np.ndarray, np.ndarray]:
+    """(frequencies, H) of a stack of FIR taps (..., L) -> H of shape (..., _n_points), all filters in one pass."""
+    return frequency_grid(_n_points, _fs), _polynomial_response(np.asarray(_taps, dtype=np.float64), _n_points)
+
+
+def sos_response(_sos: np.ndarray, _n_points: int = 512, _fs: float = 2.0) -> tuple[np.ndarray, np.ndarray]:
+    """(frequencies, H) of a stack of second-order sections (..., n_sections, 6) -> H of shape (..., _n_points).
+
+    Numerators and denominators of every section of every filter are transformed
+    together; H is the product of the section ratios.
+    """
+    _sos = np.asarray(_sos, dtype=np.float64)
+    _numerators: np.ndarray = _polynomial_response(_sos[..., :3], _n_points)
+    _denominators: np.ndarray = _polynomial_response(_sos[..., 3:], _n_points)
+    return frequency_grid(_n_points, _fs), np.prod(_numerators / _denominators, axis=-2)
+
+
+def frequency_response(_bank: list[FilterSpec], _n_points: int = 512, _fs: float = 2.0) -> tuple[np.ndarray, np.ndarray]:
+    """(frequencies, H) of a filter_bank list (FIR taps or (b, a) pairs) -> H of shape (n_filters, _n_points).
+
+    All numerators and all denominators are zero-padded to common lengths and
+    transformed in one pass each; H equals freqz(b, a, worN=_n_points) per filter.
+    """
+    _pairs: list[tuple[np.ndarray, np.ndarray]] = [
+        (np.atleast_1d(_spec[0]), np.atleast_1d(_spec[1])) if isinstance(_spec, tuple)
+        else (np.atleast_1d(_spec), np.ones(1)) for _spec in _bank]
+    _stacks: list[np.ndarray] = []
+    for _side in (0, 1):
+        _length: int = max(len(_pair[_side]) for _pair in _pairs)
+        _stacks.append(np.array([np.pad(_pair[_side].astype(np.float64), (0, _length - len(_pair[_side])))
+                                 for _pair in _pairs]))
+    return (frequency_grid(_n_points, _fs),
+            _polynomial_response(_stacks[0], _n_points) / _polynomial_response(_stacks[1], _n_points))
+
+
+@dataclass
+class ResponseMetrics:
+    """Per-filter figures of merit, one entry per filter of the evaluated stack (all in dB or Hz)."""
+    passband_ripple: np.ndarray       # Peak-to-peak gain variation inside the passband
+    stopband_attenuation: np.ndarray  # Highest stopband gain below 0 dB, as a positive number
+    cutoff_low: np.ndarray            # Lowest frequency at -3 dB from the peak gain (0 if the response starts above it)
+    cutoff_high: np.ndarray           # Highest frequency at -3 dB from the peak gain (last grid point if it ends above)
+
+
+def _crossing(_freqs: np.ndarray, _gain: np.ndarray, _level: np.ndarray, _index: np.ndarray, _step: int) -> np.ndarray:
+    # Linear interpolation of the -3 dB level between _index - _step (below) and _index (above)
+    _inside: np.ndarray = (_index - _step >= 0) & (_index - _step < len(_freqs))
+    _other: np.ndarray = np.clip(_index - _step, 0, len(_freqs) - 1)
+    _g0: np.ndarray = np.take_along_axis(_gain, _other[:, None], axis=-1)[:, 0]
+    _g1: np.ndarray = np.take_along_axis(_gain, _index[:, None], axis=-1)[:, 0]
+    _fraction: np.ndarray = np.where(_inside, (_level - _g0) / np.where(_g1 != _g0, _g1 - _g0, 1.0), 1.0)
+    return _freqs[_other] + _fraction * (_freqs[_index] - _freqs[_other])
+
+
+def _is_band(_band) -> bool:
+    return np.ndim(_band) == 1 and len(_band) == 2
+
+
+def _band_masks(_freqs: np.ndarray, _bands: list[list[Band]]) -> np.ndarray:
+    # One row per filter: the union of that filter's bands
+    _masks: np.ndarray = np.zeros((len(_bands), len(_freqs)), dtype=bool)
+    for _row, _filter_bands in zip(_masks, _bands):
+        for _low, _high in _filter_bands:
+            _row |= band_mask(_freqs, _high, _low if _low > 0 else None)
+    return _masks
+
+
+def response_metrics(_freqs: np.ndarray,
+                     _H: np.ndarray,
+                     _passband: Band | list[Band],
+                     _stopbands: list[Band] | list[list[Band]]) -> ResponseMetrics:
+    """Passband ripple, stopband attenuation and -3 dB points of every response in _H (..., n_points).
+
+    Bands are (low, high) in Hz and select the grid points with low < f < high
+    (a low edge of 0 includes DC). One passband and one list of stopbands apply
+    to every filter; a list of passbands and a list of stopband lists give each
+    filter (in flattened order) its own. The -3 dB points bracket the region
+    within 3 dB of each filter's peak gain.
+    """
+    _H = np.asarray(_H)
+    _shape: tuple[int, ...] = _H.shape[:-1]
+    _gain: np.ndarray = 20 * np.log10(np.abs(_H.reshape(-1, _H.shape[-1])) + 1e-12)
+
+    _pass_mask: np.ndarray = _band_masks(_freqs, [[_passband]] if _is_band(_passband) else [[_b] for _b in _passband])
+    _stop_mask: np.ndarray = _band_masks(
+        _freqs, [_stopbands] if all(_is_band(_b) for _b in _stopbands) else _stopbands)
+    if len(_pass_mask) not in (1, len(_gain)) or len(_stop_mask) not in (1, len(_gain)):
+        raise ValueError(f"Per-filter bands must be given for all {len(_gain)} filters.")
+    if not _pass_mask.any(axis=-1).all() or not _stop_mask.any(axis=-1).all():
+        raise ValueError("The passband and the stopbands must each contain at least one grid frequency.")
+
+    _level: np.ndarray = _gain.max(axis=-1) - 3.0
+    _above: np.ndarray = _gain >= _level[:, None]
+    _first: np.ndarray = np.argmax(_above, axis=-1)
+    _last: np.ndarray = _gain.shape[-1] - 1 - np.argmax(_above[:, ::-1], axis=-1)
+    return ResponseMetrics(
+        passband_ripple=(np.where(_pass_mask, _gain, -np.inf).max(axis=-1)
+                         - np.where(_pass_mask, _gain, np.inf).min(axis=-1)).reshape(_shape),
+        stopband_attenuation=-np.where(_stop_mask, _gain, -np.inf).max(axis=-1).reshape(_shape),
+        cutoff_low=_crossing(_freqs, _gain, _level, _first, 1).reshape(_shape),
+        cutoff_high=_crossing(_freqs, _gain, _level, _last, -1).reshape(_shape))
@@ -0,0 +1,96 @@
+""" snr_monitor.py """
+
+import numpy as np
+import scipy.fft as sfft
+import scipy.signal as signal
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SnrMonitor:
+    """Streaming SNR from Welch-averaged band powers, reported at a fixed cadence.
+
+    Blocks are cut into windowed segments (nperseg long, hop nperseg - noverlap);
+    each segment's mean power per bin is taken in the signal and the noise band,
+    and every _cadence seconds the segments since the last report are averaged
+    (a Welch estimate over that interval) into one SNR value. _smoothing > 0 also
+    runs an exponential average across reports. The SNR is the mean power per bin
+    of the signal band over that of the noise band, as in lab06 compute_snr.
+
+    Time runs along the last axis, as in filters.py: blocks may be (n,) or
+    (channels, n), so filter and filter-bank outputs feed in directly. All
+    channels are segmented and transformed together and report on the same
+    time grid. Memory is one segment of history per channel, whatever the
+    stream length.
+    """
+
+    def __init__(self,
+                 _fs: float,
+                 _signal_band: tuple[float, float],
+                 _noise_band: tuple[float, float],
+                 _nperseg: int = 1024,
+                 _noverlap: int = 512,
+                 _cadence: float = 0.5,
+                 _smoothing: float = 0.0,
+                 _window: str = 'hann'):
+        self.fs: float = _fs
+        self.nperseg: int = _nperseg
+        self.hop: int = _nperseg - _noverlap
+        self.segments_per_report: int = max(1, int(round(_cadence * _fs / self.hop)))
+        self.smoothing: float = _smoothing
+        self.window: np.ndarray = signal.get_window(_window, _nperseg)
+
+        _freqs: np.ndarray = sfft.rfftfreq(_nperseg, 1 / _fs)
+        self.signal_bins: np.ndarray = (_freqs >= _signal_band[0]) & (_freqs < _signal_band[1])
+        self.noise_bins: np.ndarray = (_freqs >= _noise_band[0]) & (_freqs < _noise_band[1])
+        if not self.signal_bins.any() or not self.noise_bins.any():
+            raise ValueError("Signal or Noise band holds no frequency bin. Adjust frequency ranges.")
+
+        self.signal_power: np.ndarray | float = 0.0  # Band powers of the last report
+        self.noise_power: np.ndarray | float = 0.0
+        self._history: np.ndarray | None = None      # Samples not yet in a complete segment
+        self._segments: int = 0                      # Segments taken so far
+        self._sums: np.ndarray | None = None         # (signal, noise) power sums since the last report
+        self._smoothed: np.ndarray | None = None
+
+    def process(self, _x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Block -> (report times in seconds, SNR in dB) for the reports it completes; (channels, reports) if batched."""
+        _x = np.asarray(_x)
+        _channels: tuple[int, ...] = _x.shape[:-1]
+        _buffer: np.ndarray = _x if self._history is None else np.concatenate((self._history, _x), axis=-1)
+        _n_seg: int = max(0, (_buffer.shape[-1] - self.nperseg) // self.hop + 1)
+        self._history = _buffer[..., _n_seg * self.hop:]
+        if self._sums is None:
+            self._sums = np.zeros((2,) + _channels)
+        if _n_seg == 0:
+            return np.zeros(0), np.zeros(_channels + (0,))
+
+        # ([channels,] segments, nperseg) -> mean power per bin in each band: (2, segments, [channels])
+        _segments: np.ndarray = sliding_window_view(_buffer[..., :(_n_seg - 1) * self.hop + self.nperseg],
+                                                    self.nperseg, axis=-1)[..., ::self.hop, :] * self.window
+        _power: np.ndarray = np.abs(sfft.rfft(_segments, axis=-1)) ** 2
+        _bands: np.ndarray = np.moveaxis(np.stack((np.mean(_power[..., self.signal_bins], axis=-1),
+                                                   np.mean(_power[..., self.noise_bins], axis=-1))), -1, 1)
+
+        # Segment g closes a report when (g + 1) is a multiple of segments_per_report
+        _g: np.ndarray = self._segments + np.arange(_n_seg)
+        self._segments += _n_seg
+        _ends: np.ndarray = np.flatnonzero((_g + 1) % self.segments_per_report == 0)
+        _cum: np.ndarray = np.concatenate((np.zeros((2, 1) + _channels), np.cumsum(_bands, axis=1)), axis=1)
+        if len(_ends) == 0:
+            self._sums = self._sums + _cum[:, -1]
+            return np.zeros(0), np.zeros(_channels + (0,))
+
+        _sums: np.ndarray = _cum[:, _ends + 1] - _cum[:, np.r_[0, _ends[:-1] + 1]]
+        _sums[:, 0] += self._sums
+        self._sums = _cum[:, -1] - _cum[:, _ends[-1] + 1]
+        _means: np.ndarray = _sums / self.segments_per_report
+
+        if self.smoothing > 0:
+            for _r in range(_means.shape[1]):
+                self._smoothed = _means[:, _r].copy() if self._smoothed is None else \
+                    self.smoothing * self._smoothed + (1 - self.smoothing) * _means[:, _r]
+                _means[:, _r] = self._smoothed
+
+        self.signal_power, self.noise_power = _means[0, -1], _means[1, -1]
+        _times: np.ndarray = (_g[_ends] * self.hop + self.nperseg) / self.fs
+        return _times, np.moveaxis(10 * np.log10(_means[0] / np.maximum(_means[1], 1e-30)), 0, -1)
@@ -0,0 +1,88 @@
+""" spectrum.py """
+
+from functools import lru_cache
+
+import numpy as np
+import scipy.fft as sfft
+
+
+def spectrum(_x: np.ndarray, _fs: float = 1.0, _n: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """(frequencies, spectrum) of _x along the last axis, zero-padded or cropped to _n samples.
+
+    Real input takes the rfft fast path: only bins 0..n/2 (the others are their
+    conjugates) on an rfftfreq axis, for about half the time and memory. Complex
+    input gets the full fft on an fftfreq axis.
+    """
+    _x = np.asarray(_x)
+    _n = _x.shape[-1] if _n is None else _n
+    if np.isrealobj(_x):
+        return sfft.rfftfreq(_n, 1 / _fs), sfft.rfft(_x, _n, axis=-1)
+    return sfft.fftfreq(_n, 1 / _fs), sfft.fft(_x, _n, axis=-1)
+
+
+def inverse_spectrum(_X: np.ndarray, _n: int) -> np.ndarray:
+    """Inverse of spectrum() for an _n-sample signal: real (irfft) from a one-sided spectrum, complex otherwise.
+
+    One-sided is recognised by its length (n // 2 + 1 bins); for n <= 2 both forms
+    have n bins and the complex inverse gives the same values.
+    """
+    _X = np.asarray(_X)
+    if _X.shape[-1] != _n:
+        return sfft.irfft(_X, _n, axis=-1)
+    return sfft.ifft(_X, _n, axis=-1)
+
+
+def hermitian_weights(_n: int) -> np.ndarray:
+    """Bins of the full _n-point spectrum that each one-sided bin stands for: 1 for DC (and Nyquist if _n is even), else 2.
+
+    Weighting one-sided |X|^2 with these gives the same power sums as the full spectrum.
+    """
+    return _hermitian_weights(int(_n))
+
+
+@lru_cache(maxsize=64)
+def _hermitian_weights(_n: int) -> np.ndarray:
+    _weights: np.ndarray = np.full(_n // 2 + 1, 2.0)
+    _weights[0] = 1.0
+    if _n % 2 == 0:
+        _weights[-1] = 1.0
+    _weights.flags.writeable = False
+    return _weights
+
+
+def band_mask(_freqs: np.ndarray, _high: float, _low: float | None = None) -> np.ndarray:
+    """Boolean mask of the bins of an fftfreq or rfftfreq axis with _low < |f| < _high (no lower bound if _low is None).
+
+    The mask depends only on the axis length and kind, its bin spacing and the
+    band, so it is built once with array comparisons and cached (read-only) for
+    every later call with the same (N, df, band). Any other axis (shifted,
+    non-uniform, ...) fails the endpoint check and is masked from its values
+    directly. A band symmetric in |f| keeps the mirrored bins of a real signal
+    together, so masking the one-sided spectrum and inverting it matches
+    masking the full one.
+    """
+    _freqs = np.asarray(_freqs)
+    _n: int = len(_freqs)
+    _df: float = abs(float(_freqs[1])) if _n > 1 else 0.0
+    _one_sided: bool = _n > 1 and float(_freqs[-1]) > 0
+    # fftfreq and rfftfreq axes start at 0 and end at bin n - 1 or -1 (n // 2 for rfftfreq)
+    _last_bin: int = (_n - 1 if _one_sided else -1) if _n > 1 else 0
+    if _n and float(_freqs[0]) == 0 and np.isclose(float(_freqs[-1]), _last_bin * _df):
+        return _band_mask(_n, _df, _one_sided, float(_high), None if _low is None else float(_low))
+    _abs_freqs: np.ndarray = np.abs(_freqs)
+    _mask: np.ndarray = _abs_freqs < _high
+    if _low is not None:
+        _mask &= _abs_freqs > _low
+    return _mask
+
+
+@lru_cache(maxsize=64)
+def _band_mask(_n: int, _df: float, _one_sided: bool, _high: float, _low: float | None) -> np.ndarray:
+    # Same values as fftfreq / rfftfreq: integer bin numbers times the spacing
+    _bins: np.ndarray = np.arange(_n) if _one_sided else np.fft.ifftshift(np.arange(-(_n // 2), (_n + 1) // 2))
+    _abs_freqs: np.ndarray = np.abs(_bins * _df)
+    _mask: np.ndarray = _abs_freqs < _high
+    if _low is not None:
+        _mask &= _abs_freqs > _low
+    _mask.flags.writeable = False
+    return _mask
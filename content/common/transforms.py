@@ -0,0 +1,190 @@
+""" transforms.py """
+
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+import scipy.fft as sfft
+
+# Backend name -> transform(x, inverse) along the last axis, unnormalised in both directions
+DFT_BACKENDS: dict[str, Callable[[np.ndarray, bool], np.ndarray]] = {}
+
+# Bytes the 'matrix' backend may spend on one block of DFT-matrix rows
+MATRIX_BLOCK_BYTES: int = 2 ** 26
+
+
+class TwiddleCache:
+    """Process-wide LRU cache of twiddle tables and DFT matrices, bounded by total bytes.
+
+    Tables are read-only once cached; the least recently used ones are evicted
+    when a new table would push the total over max_bytes.
+    """
+
+    def __init__(self, _max_bytes: int = 2 ** 28):
+        self.max_bytes: int = _max_bytes
+        self.nbytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._tables: OrderedDict[tuple, np.ndarray] = OrderedDict()
+
+    def get(self, _key: tuple, _build: Callable[[], np.ndarray]) -> np.ndarray:
+        """Cached table for _key, built with _build() on a miss."""
+        if _key in self._tables:
+            self.hits += 1
+            self._tables.move_to_end(_key)
+            return self._tables[_key]
+
+        self.misses += 1
+        _table: np.ndarray = _build()
+        _table.flags.writeable = False
+        if _table.nbytes <= self.max_bytes:
+            while self.nbytes + _table.nbytes > self.max_bytes:
+                _, _evicted = self._tables.popitem(last=False)
+                self.nbytes -= _evicted.nbytes
+                self.evictions += 1
+            self._tables[_key] = _table
+            self.nbytes += _table.nbytes
+        return _table
+
+    def clear(self) -> None:
+        self._tables.clear()
+        self.nbytes = 0
+
+    def stats(self) -> str:
+        return (f"{len(self._tables)} tables, {self.nbytes / 2 ** 20:.1f} MiB; "
+                f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions")
+
+
+TWIDDLE_CACHE: TwiddleCache = TwiddleCache()
+
+
+def twiddles(_N: int, _inverse: bool = False, _dtype: np.dtype = np.complex128) -> np.ndarray:
+    """exp(-+j*2*pi*n/N) for n = 0..N-1; the inverse table is the conjugate of the forward one."""
+    _dtype = np.dtype(_dtype)
+    if _inverse:
+        return TWIDDLE_CACHE.get(('twiddles', _N, True, _dtype), lambda: np.conj(twiddles(_N, False, _dtype)))
+    return TWIDDLE_CACHE.get(('twiddles', _N, False, _dtype),
+                             lambda: np.exp(-2j * np.pi * np.arange(_N) / _N).astype(_dtype))
+
+
+def dft_matrix(_N: int, _inverse: bool = False, _dtype: np.dtype = np.complex128) -> np.ndarray:
+    """N x N DFT matrix, gathered from the twiddle table (W[k, n] = w[k * n mod N])."""
+    _dtype = np.dtype(_dtype)
+    return TWIDDLE_CACHE.get(('matrix', _N, _inverse, _dtype),
+                             lambda: _dft_rows(_N, np.arange(_N), _inverse, _dtype))
+
+
+def _dft_rows(_N: int, _k: np.ndarray, _inverse: bool, _dtype: np.dtype) -> np.ndarray:
+    return twiddles(_N, _inverse, _dtype)[np.outer(_k, np.arange(_N)) % _N]
+
+
+def _complex_dtype(_x: np.ndarray) -> np.dtype:
+    return np.dtype(np.complex64) if _x.dtype in (np.float32, np.complex64) else np.dtype(np.complex128)
+
+
+def register_backend(_name: str) -> Callable:
+    """Decorator adding a transform(x, inverse) function to DFT_BACKENDS."""
+    def _register(_transform: Callable[[np.ndarray, bool], np.ndarray]) -> Callable[[np.ndarray, bool], np.ndarray]:
+        DFT_BACKENDS[_name] = _transform
+        return _transform
+    return _register
+
+
+@register_backend('loop')
+def _loop(_x: np.ndarray, _inverse: bool) -> np.ndarray:
+    """One output bin at a time, its exponentials gathered from the twiddle table: O(N^2) time, O(N) memory."""
+    _N: int = _x.shape[-1]
+    _n: np.ndarray = np.arange(_N)
+    _w: np.ndarray = twiddles(_N, _inverse, _complex_dtype(_x))
+    _X: np.ndarray = np.zeros(_x.shape, dtype=_w.dtype)
+    for _k in range(_N):
+        _X[..., _k] = np.sum(_x * _w[_k * _n % _N], axis=-1)
+    return _X
+
+
+@register_backend('matrix')
+def _matrix(_x: np.ndarray, _inverse: bool) -> np.ndarray:
+    """DFT matrix product, never holding more than MATRIX_BLOCK_BYTES of the matrix.
+
+    A matrix that fits in one block is cached whole; larger ones are gathered
+    from the twiddle table a block of rows at a time instead of all N x N.
+    """
+    _N: int = _x.shape[-1]
+    _dtype: np.dtype = _complex_dtype(_x)
+    if _N * _N * _dtype.itemsize <= MATRIX_BLOCK_BYTES:
+        return _x @ dft_matrix(_N, _inverse, _dtype).T
+
+    _rows: int = max(1, MATRIX_BLOCK_BYTES // (_dtype.itemsize * _N))
+    _X: np.ndarray = np.empty(_x.shape, dtype=_dtype)
+    for _k0 in range(0, _N, _rows):
+        _k: np.ndarray = np.arange(_k0, min(_N, _k0 + _rows))
+        _X[..., _k0:_k0 + len(_k)] = _x @ _dft_rows(_N, _k, _inverse, _dtype).T
+    return _X
+
+
+def _smallest_factor(_N: int) -> int:
+    for _p in range(2, int(_N ** 0.5) + 1):
+        if _N % _p == 0:
+            return _p
+    return _N
+
+
+@register_backend('fft')
+def _mixed_radix(_x: np.ndarray, _inverse: bool) -> np.ndarray:
+    """Pure-NumPy decimation-in-time FFT: radix-2 for powers of two, mixed radix otherwise.
+
+    N = p * m splits into p interleaved length-m transforms (done together, as one
+    batch, by the recursive call), twiddled and merged by p-point DFTs; prime
+    lengths fall back to the matrix product.
+    """
+    _N: int = _x.shape[-1]
+    _p: int = _smallest_factor(_N)
+    if _N == 1:
+        return _x.astype(_complex_dtype(_x))
+    if _p == _N:
+        return _matrix(_x, _inverse)
+
+    _m: int = _N // _p
+    _dtype: np.dtype = _complex_dtype(_x)
+    # x[r + p * n2] for each r: shape (..., p, m), transformed along the last axis
+    _sub: np.ndarray = _mixed_radix(np.swapaxes(_x.reshape(_x.shape[:-1] + (_m, _p)), -1, -2), _inverse)
+    # W_N^(r * k1) for r < p, k1 < m, gathered straight into a p x m table (no p x N base kept alive)
+    _stage: np.ndarray = TWIDDLE_CACHE.get(
+        ('stage', _N, _p, _inverse, _dtype),
+        lambda: twiddles(_N, _inverse, _dtype)[np.outer(np.arange(_p), np.arange(_m))])
+    # X[k1 + m * k2] = sum_r W_p^(r * k2) * W_N^(r * k1) * Y_r[k1]
+    _X: np.ndarray = np.einsum('kr,...rm->...km', dft_matrix(_p, _inverse, _dtype), _sub * _stage)
+    return _X.reshape(_x.shape[:-1] + (_N,))
+
+
+@register_backend('scipy')
+def _scipy(_x: np.ndarray, _inverse: bool) -> np.ndarray:
+    return sfft.ifft(_x, axis=-1, norm='forward') if _inverse else sfft.fft(_x, axis=-1)
+
+
+def dft(_s: np.ndarray, _backend: str = 'scipy') -> np.ndarray:
+    """Discrete Fourier Transform along the last axis with the chosen backend."""
+    return DFT_BACKENDS[_backend](np.asarray(_s), False)
+
+
+def idft(_S: np.ndarray, _backend: str = 'scipy') -> np.ndarray:
+    """Inverse Discrete Fourier Transform along the last axis with the chosen backend."""
+    _S = np.asarray(_S)
+    return DFT_BACKENDS[_backend](_S, True) / _S.shape[-1]
+
+
+def compare_backends(
+        _s: np.ndarray,
+        _backends: tuple[str, ...] | None = None,
+        _reference: str = 'scipy'
+) -> dict[str, tuple[float, float]]:
+    """Cross-check: {backend: (max |error| against _reference, seconds)} for dft(_s)."""
+    _expected: np.ndarray = dft(_s, _reference)
+    _results: dict[str, tuple[float, float]] = {}
+    for _name in _backends or tuple(DFT_BACKENDS):
+        _t0: float = time.perf_counter()
+        _S: np.ndarray = dft(_s, _name)
+        _results[_name] = (float(np.max(np.abs(_S - _expected))), time.perf_counter() - _t0)
+    return _results
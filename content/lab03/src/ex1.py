@@ -73,11 +73,13 @@ print(f"=======================================\n")
 
 k_max_values: list[int] = [1, 5, 11, 49]
 
-for current_k_max in k_max_values:
-    print(f"Evaluating reconstruction with k_max = {current_k_max}...")
+# One coefficient row per k_max (harmonics above it zeroed), reconstructed in a single call
+k_values, coefficients = dft(max(k_max_values), A)
+coefficient_batch: np.ndarray = np.where(np.abs(k_values) <= np.array(k_max_values)[:, None], coefficients, 0)
+reconstructed_signals: np.ndarray = idft(time_samples, k_values, coefficient_batch, T)
 
-    k_values, coefficients = dft(current_k_max, A)
-    reconstructed_signal = idft(time_samples, k_values, coefficients, T)
+for current_k_max, reconstructed_signal in zip(k_max_values, reconstructed_signals):
+    print(f"Evaluating reconstruction with k_max = {current_k_max}...")
 
     plt.figure(figsize=(10, 4))
     plt.plot(time_samples, reconstructed_signal, 'r-', linewidth=2,
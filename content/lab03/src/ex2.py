@@ -102,8 +102,26 @@ print(f"\n7. Reconstructing and Plotting Signal with Optimal N")
 print(f"=======================================\n")
 ###################################################
 
-k_values, coefficients = dft(optimal_N, A)
-reconstructed_signal = idft(t, k_values, coefficients, T)
+# Sweep N = 1 .. k_max by growing one partial sum a harmonic at a time (no restart per N),
+# measuring the RMS error of every reconstruction on the samples and keeping the one at optimal_N
+partial_sum: PartialSum = PartialSum(t, T, lambda _k: rectangular_coefficients(_k, A))
+measured_rms_error: np.ndarray = np.zeros(k_max)
+for N in range(1, k_max + 1):
+    partial_reconstruction: np.ndarray = partial_sum.step()
+    measured_rms_error[N - 1] = np.sqrt(np.mean((original_signal - partial_reconstruction) ** 2))
+    if N == optimal_N:
+        reconstructed_signal: np.ndarray = partial_reconstruction
+print(f"Measured RMS error on the {T} samples at N = {optimal_N}: {measured_rms_error[optimal_N - 1]:.4f}")
+
+plt.figure(figsize=(10, 4))
+plt.semilogy(positive_indices, rms_error_values, label=r'$\text{RMS Error (Parseval)}$')
+plt.semilogy(positive_indices, measured_rms_error, label=r'$\text{RMS Error (measured on the samples)}$')
+plt.title(r'$\text{RMS Error of the Partial Sums as a Function of } N$', fontsize=14)
+plt.xlabel(r'$N$', fontsize=12)
+plt.ylabel(r'$\text{RMS Error (log scale)}$', fontsize=12)
+plt.legend(fontsize=12)
+plt.grid(True)
+plt.show()
 
 plt.figure(figsize=(10, 4))
 plt.plot(t, reconstructed_signal, 'r-', linewidth=2, label=fr'$\text{{Reconstructed Signal }}(N={optimal_N})$')
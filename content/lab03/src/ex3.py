@@ -2,6 +2,7 @@
 
 import numpy as np
 import matplotlib.pyplot as plt
+from modem import ModemDemodulator, ModemEncoder, bit_errors
 
 ###################################################
 print(f"\n1. Defining Signal Parameters")
@@ -25,7 +26,6 @@ print(f"=======================================\n")
 ###################################################
 
 random_sequence: np.ndarray = np.random.randint(0, 4, 10)
-encoded_signal: np.ndarray = np.array([])
 
 print(f"Generated random sequence: {random_sequence}")
 
@@ -34,20 +34,11 @@ print(f"\n3. Encoding Signal")
 print(f"=======================================\n")
 ###################################################
 
-signal: np.ndarray = np.array([])
+# One waveform per bit pair ('00' silence, '01' f1, '10' f2, '11' f1 + f2), computed once
+encoder: ModemEncoder = ModemEncoder(t, f1, f2)
 
-for bit_pair in random_sequence:
-    if bit_pair == 0:  # '00'
-        signal = np.zeros_like(t)
-    elif bit_pair == 1:  # '01'
-        signal = np.sin(2 * np.pi * f1 * t)
-    elif bit_pair == 2:  # '10'
-        signal = np.sin(2 * np.pi * f2 * t)
-    elif bit_pair == 3:  # '11'
-        signal = np.sin(2 * np.pi * f1 * t) + np.sin(2 * np.pi * f2 * t)
-
-    # Append the signal corresponding to the current bit pair
-    encoded_signal = np.hstack((encoded_signal, signal))
+# Gather the waveform of every bit pair into one preallocated signal
+encoded_signal: np.ndarray = encoder.encode(random_sequence)
 
 print("Signal encoding complete.")
 
@@ -68,6 +59,23 @@ plt.show()
 
 print("\nEncoding and visualization complete.")
 
+###################################################
+print(f"\n5. Demodulating the Noisy Signal")
+print(f"=======================================\n")
+###################################################
+
+noise_std: float = 1.0
+received_signal: np.ndarray = encoded_signal + noise_std * np.random.randn(len(encoded_signal))
+
+# Matched filter over every symbol window at once, fed in arbitrary-sized blocks as a stream would be
+demodulator: ModemDemodulator = ModemDemodulator(encoder)
+decoded_sequence: np.ndarray = np.concatenate([demodulator.process(block)
+                                               for block in np.array_split(received_signal, 7)])
+errors, ber = bit_errors(random_sequence, decoded_sequence)
+
+print(f"Decoded sequence: {decoded_sequence}")
+print(f"Bit errors: {errors} / {2 * len(random_sequence)} (BER = {ber:.4f})")
+
 ###################################################
 print("\nSimulation complete!")
 print("=======================================\n")
@@ -1,7 +1,17 @@
 """ fourier_series.py """
 
+from typing import Callable
+
 import numpy as np
 
+def rectangular_coefficients(_k_values: np.ndarray, _amplitude: float) -> np.ndarray:
+    """c_k of the +-A rectangular signal: 2A / (j * pi * k) for odd k, zero otherwise."""
+    _k_values = np.asarray(_k_values)
+    _odd: np.ndarray = _k_values % 2 != 0
+    _ck: np.ndarray = np.zeros(len(_k_values), dtype=np.complex128)
+    _ck[_odd] = 2 * _amplitude / (1j * np.pi * _k_values[_odd])
+    return _ck
+
 def dft(
         _k_max: int,
         _amplitude: float
@@ -10,32 +20,33 @@ def dft(
     print(f"Computing Fourier coefficients for k_max = {_k_max}, amplitude = {_amplitude}...")
 
     _k_values: np.ndarray = np.arange(-_k_max, _k_max + 1, dtype=np.int32)
-    _ck: np.ndarray = np.zeros(len(_k_values), dtype=np.complex128)
-
-    for _i in range(len(_k_values)):
-        _k_value: int = int(_k_values[_i])
-
-        if _k_value != 0 and _k_value % 2 != 0:
-            _ck[_i] = 2 * _amplitude / (1j * np.pi * _k_value)
-        else:
-            _ck[_i] = 0
+    _ck: np.ndarray = rectangular_coefficients(_k_values, _amplitude)
 
     print("Fourier coefficients computed successfully.")
     return _k_values, _ck
 
+def fourier_basis(
+        _time_samples: np.ndarray,
+        _k_values: np.ndarray,
+        _period: int
+) -> np.ndarray:
+    """Complex exponentials exp(j*2*pi*k*t/T), one row per k."""
+    return np.exp(1j * 2 * np.pi * np.outer(_k_values, _time_samples) / _period)
+
 def idft(
         _time_samples: np.ndarray,
         _k_values: np.ndarray,
         _ck: np.ndarray,
         _period: int
 ) -> np.ndarray:
-    """Discrete signal using the DFT."""
-    print("Reconstructing signal using Fourier series...")
+    """Discrete signal using the DFT.
 
-    _s_rec: np.ndarray = np.zeros(_period, dtype=np.complex128)
+    _ck may also be a batch of coefficient vectors (one per row), giving one
+    reconstruction per row from a single product with the k x t basis.
+    """
+    print("Reconstructing signal using Fourier series...")
 
-    for _i in range(len(_k_values)):
-        _s_rec += _ck[_i] * np.exp(1j * 2 * np.pi * _k_values[_i] * _time_samples / _period)
+    _s_rec: np.ndarray = _ck @ fourier_basis(_time_samples, _k_values, _period)
 
     print("Signal reconstruction complete.")
     return np.real(_s_rec)
@@ -43,12 +54,44 @@ def idft(
 def rms_error(_ck: np.ndarray, _n_max: int) -> np.ndarray:
     """RMS error between the original and reconstructed signal."""
     total_power: float = 1.0  # Total power: A^2
-    _rms_error: np.ndarray = np.zeros(_n_max)
 
-    for _N in range(1, _n_max + 1):
-        power_of_terms: float = 2 * np.sum(np.abs(_ck[1:_N + 1]) ** 2) + np.abs(_ck[0]) ** 2
-        result: float = total_power - power_of_terms
-        _rms_error[_N - 1] = np.sqrt(result)
+    # Power of the terms _ck[1:N + 1] for every N from one running sum (N past the end of _ck adds nothing)
+    _cumulative: np.ndarray = np.concatenate(([0.0], np.cumsum(np.abs(_ck[1:_n_max + 1]) ** 2)))
+    _N: np.ndarray = np.minimum(np.arange(1, _n_max + 1), len(_cumulative) - 1)
+    power_of_terms: np.ndarray = 2 * _cumulative[_N] + np.abs(_ck[0]) ** 2
+    _rms_error: np.ndarray = np.sqrt(total_power - power_of_terms)
 
     print("RMS error computed successfully.")
-    return _rms_error
\ No newline at end of file
+    return _rms_error
+
+class PartialSum:
+    """Fourier partial sum over |k| <= k_max that grows one harmonic at a time.
+
+    Only the newly added harmonics are evaluated, so sweeping k_max from 1 to N
+    costs O(N * T) overall instead of restarting every reconstruction from zero.
+    """
+
+    def __init__(
+            self,
+            _time_samples: np.ndarray,
+            _period: int,
+            _coefficients: Callable[[np.ndarray], np.ndarray]
+    ):
+        self.time_samples: np.ndarray = _time_samples
+        self.period: int = _period
+        self.coefficients: Callable[[np.ndarray], np.ndarray] = _coefficients
+        self.k_max: int = 0
+        self._s_rec: np.ndarray = np.full(len(_time_samples), _coefficients(np.array([0]))[0], dtype=np.complex128)
+
+    def extend(self, _k_max: int) -> np.ndarray:
+        """Add the harmonics +-(k_max + 1) .. +-_k_max and return the reconstructed signal."""
+        _k_new: np.ndarray = np.arange(self.k_max + 1, _k_max + 1)
+        if len(_k_new):
+            _k_new = np.concatenate((_k_new, -_k_new))
+            self._s_rec += self.coefficients(_k_new) @ fourier_basis(self.time_samples, _k_new, self.period)
+            self.k_max = _k_max
+        return np.real(self._s_rec)
+
+    def step(self) -> np.ndarray:
+        """k_max -> k_max + 1."""
+        return self.extend(self.k_max + 1)
@@ -0,0 +1,78 @@
+""" modem.py """
+
+from typing import Iterator
+
+import numpy as np
+
+# Bit pair -> (f1, f2) weights: '00' silence, '01' f1, '10' f2, '11' f1 + f2
+TONE_MAP: np.ndarray = np.array([[0, 0], [1, 0], [0, 1], [1, 1]], dtype=np.float64)
+
+
+class ModemEncoder:
+    """Two-tone symbol encoder driven by a precomputed waveform table.
+
+    Each symbol's waveform is computed once; encoding is a single gather of
+    table rows into a preallocated (symbols x samples_per_symbol) output.
+    """
+
+    def __init__(
+            self,
+            _t: np.ndarray,
+            _f1: float,
+            _f2: float,
+            _tone_map: np.ndarray = TONE_MAP
+    ):
+        self.t: np.ndarray = _t
+        self.f1: float = _f1
+        self.f2: float = _f2
+        self.tone_map: np.ndarray = _tone_map
+        # One row per symbol: weighted sum of the two tones over one symbol period
+        self.table: np.ndarray = _tone_map @ np.sin(2 * np.pi * np.outer([_f1, _f2], _t))
+        self.samples_per_symbol: int = len(_t)
+
+    def encode(self, _symbols: np.ndarray) -> np.ndarray:
+        """Symbol indices -> concatenated waveform, len(_symbols) * samples_per_symbol samples."""
+        _out: np.ndarray = np.empty((len(_symbols), self.samples_per_symbol), dtype=self.table.dtype)
+        np.take(self.table, _symbols, axis=0, out=_out)
+        return _out.ravel()
+
+    def frames(self, _symbols: np.ndarray, _frame_size: int) -> Iterator[np.ndarray]:
+        """Stream the encoded waveform in frames of _frame_size samples (the last one may be shorter)."""
+        _flat_table: np.ndarray = self.table.ravel()
+        _total: int = len(_symbols) * self.samples_per_symbol
+        for _start in range(0, _total, _frame_size):
+            _n: np.ndarray = np.arange(_start, min(_total, _start + _frame_size))
+            _symbol, _offset = np.divmod(_n, self.samples_per_symbol)
+            yield np.take(_flat_table, _symbols[_symbol] * self.samples_per_symbol + _offset)
+
+
+class ModemDemodulator:
+    """Matched-filter receiver for ModemEncoder signals.
+
+    The stream is cut into symbol windows and every window is correlated with
+    every symbol waveform in one matrix product; the decision is the maximum
+    likelihood one in white noise, argmax(<y, s> - |s|^2 / 2). Samples of an
+    incomplete window are kept for the next process() call.
+    """
+
+    def __init__(self, _encoder: ModemEncoder):
+        self.table: np.ndarray = _encoder.table
+        self.samples_per_symbol: int = _encoder.samples_per_symbol
+        self._bias: np.ndarray = 0.5 * np.sum(self.table ** 2, axis=1)
+        self._remainder: np.ndarray = np.zeros(0)
+
+    def process(self, _x: np.ndarray) -> np.ndarray:
+        """Stream block -> symbols of every window it completes."""
+        _buffer: np.ndarray = np.concatenate((self._remainder, _x))
+        _n_symbols: int = len(_buffer) // self.samples_per_symbol
+        _windows: np.ndarray = _buffer[:_n_symbols * self.samples_per_symbol].reshape(_n_symbols, self.samples_per_symbol)
+        self._remainder = _buffer[_n_symbols * self.samples_per_symbol:]
+        return np.argmax(_windows @ self.table.T - self._bias, axis=1)
+
+
+def bit_errors(_sent: np.ndarray, _received: np.ndarray, _bits_per_symbol: int = 2) -> tuple[int, float]:
+    """Bit errors between two symbol sequences (compared over their common length) and the bit error rate."""
+    _n: int = min(len(_sent), len(_received))
+    _diff: np.ndarray = np.bitwise_xor(np.asarray(_sent[:_n]), np.asarray(_received[:_n]))
+    _errors: int = int(sum(np.sum(_diff >> _b & 1) for _b in range(_bits_per_symbol)))
+    return _errors, _errors / max(1, _n * _bits_per_symbol)
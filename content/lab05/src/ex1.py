@@ -1,8 +1,13 @@
 """ ex1.py """
 
+import os
+import sys
+import time
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import lfilter
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from filters import FirFilter, MovingAverage
 
 ###################################################
 print(f"\n1. Defining Signal Parameters")
@@ -24,15 +29,16 @@ print(f"=======================================\n")
 ###################################################
 
 def process_signal(_input_signal: np.ndarray) -> np.ndarray:
-    """Process the input signal with a moving average filter."""
-    _N: int = len(_input_signal)
-    _output_signal: np.ndarray = np.zeros(_N)
-    for _n in range(4, _N):
-        _output_signal[_n] = np.mean(_input_signal[_n - 4:_n + 1])
+    """Process the input signal (or a batch of them, along the last axis) with a 5-point moving average filter.
+
+    Outputs stay 0 until the first full window, at sample 4.
+    """
+    _output_signal: np.ndarray = MovingAverage(5).process(_input_signal)
+    _output_signal[..., :4] = 0
     return _output_signal
 
 sinusoids: list[np.ndarray] = [A * np.sin(2 * np.pi * f * t) for f in frequencies]
-processed_sinusoids: list[np.ndarray] = [process_signal(s) for s in sinusoids]
+processed_sinusoids: list[np.ndarray] = list(process_signal(np.array(sinusoids)))
 
 def plot_signals(_t, _signals, _titles, _labels, colors):
     for i, signal in enumerate(_signals):
@@ -66,7 +72,7 @@ noise_std: float = 0.1
 
 # Generate and process noisy sinusoids
 noisy_sinusoids: list[np.ndarray] = [s + np.random.normal(noise_mean, noise_std, s.shape) for s in sinusoids]
-processed_noisy_sinusoids: list[np.ndarray] = [process_signal(ns) for ns in noisy_sinusoids]
+processed_noisy_sinusoids: list[np.ndarray] = list(process_signal(np.array(noisy_sinusoids)))
 
 plot_signals(t, noisy_sinusoids,
              [rf'Noisy Input at {f} Hz' for f in frequencies],
@@ -86,13 +92,35 @@ print(f"=======================================\n")
 b: np.ndarray = np.ones(5) / 5
 a: np.ndarray = np.array(1)
 
-lfilter_outputs: list[np.ndarray] = [lfilter(b, a, pns) for pns in processed_noisy_sinusoids]
+# All five signals through one stateful FIR filter call (a = 1), one channel per row
+lfilter_outputs: list[np.ndarray] = list(FirFilter(b / a).process(np.array(processed_noisy_sinusoids)))
 
 plot_signals(t, lfilter_outputs,
              [rf'lfilter Output at {f} Hz' for f in frequencies],
              [rf'lfilter Output at {f} Hz' for f in frequencies],
              ['r'] * len(frequencies))
 
+###################################################
+print(f"\n5. Streaming the Moving Average over a Long Signal")
+print(f"=======================================\n")
+###################################################
+
+# The filter state carries over block edges: block-by-block output equals the one-shot output.
+# A large DC offset would make an ever-growing running sum drift; check against np.convolve.
+block_size: int = 4096
+long_signal: np.ndarray = 1e6 + np.random.normal(noise_mean, noise_std, 2 ** 22)
+
+moving_average = MovingAverage(5)
+start: float = time.perf_counter()
+streamed: np.ndarray = np.concatenate([moving_average.process(long_signal[i:i + block_size])
+                                       for i in range(0, len(long_signal), block_size)])
+elapsed: float = time.perf_counter() - start
+
+reference: np.ndarray = np.convolve(long_signal, np.ones(5) / 5)[:len(long_signal)]
+print(f"{len(long_signal)} samples in blocks of {block_size}: {elapsed * 1e9 / len(long_signal):.1f} ns/sample, "
+      f"identical to one call: {np.array_equal(streamed, MovingAverage(5).process(long_signal))}, "
+      f"max error vs np.convolve: {np.abs(streamed - reference).max():.1e}")
+
 ###################################################
 print("\nSimulation complete!")
 print("=======================================\n")
@@ -1,9 +1,14 @@
 """ ex2.py """
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.fft import fftshift, fft, ifft
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from transforms import TWIDDLE_CACHE, compare_backends, dft, idft
+
 ###################################################
 print(f"\n1. Defining Signal Parameters")
 print(f"=======================================\n")
@@ -24,23 +29,11 @@ print(f"\n2. Computing DFT and IDFT")
 print(f"=======================================\n")
 ###################################################
 
-def dft(_s: np.ndarray) -> np.ndarray:
-    """Discrete Fourier Transform (DFT)."""
-    _N: int = len(_s)
-    _S: np.ndarray = np.zeros(_N, dtype=complex)
-    for _k in range(_N):
-        _S[_k] = np.sum(_s * np.exp(-2j * np.pi * _k * np.arange(_N) / _N))
-    return _S
-
-def idft(_S: np.ndarray) -> np.ndarray:
-    """Inverse Discrete Fourier Transform (IDFT)."""
-    _N: int = len(_S)
-    _s: np.ndarray = np.zeros(_N, dtype=complex)
-    for _n in range(_N):
-        _s[_n] = np.sum(_S * np.exp(2j * np.pi * np.arange(_N) * _n / _N)) / _N
-    return _s
+# Any backend in transforms.DFT_BACKENDS: 'loop' (one exponential per bin, the textbook sum),
+# 'matrix' (DFT matrix in bounded blocks), 'fft' (pure NumPy mixed-radix FFT) or 'scipy'
+dft_backend: str = 'fft'
 
-spectrum_dft: np.ndarray = dft(s)  # Custom DFT
+spectrum_dft: np.ndarray = dft(s, dft_backend)  # Custom DFT
 spectrum: np.ndarray = fft(s)      # SciPy FFT
 
 ###################################################
@@ -83,13 +76,14 @@ print(f"=======================================\n")
 
 spectrum_shifted: np.ndarray = fftshift(spectrum)  # Shift DFT
 spectrum_inverse: np.ndarray = ifft(spectrum)      # SciPy IDFT
+spectrum_inverse_dft: np.ndarray = idft(spectrum_dft, dft_backend)  # Custom IDFT
 
 plot_spectrum(fx, spectrum_shifted,
               r'Fourier Coefficients Before Amplitude Modulation')
 
 plt.figure(figsize=(10, 4))
 plt.subplot(1, 2, 1)
-plt.stem(fx, np.abs(spectrum_inverse), basefmt=" ")
+plt.stem(fx, np.abs(spectrum_inverse_dft), basefmt=" ")
 plt.title(r'Inverse Our IDFT (Original Signal)')
 plt.xlabel(r'Frequency Component \( k \)')
 plt.ylabel(r'Magnitude')
@@ -122,7 +116,7 @@ print(f"\n6. Computing and Plotting Modulated Signal Spectrum")
 print(f"=======================================\n")
 ###################################################
 
-spectrum_modulated_dft: np.ndarray = dft(modulated_signal)                  # Custom DFT
+spectrum_modulated_dft: np.ndarray = dft(modulated_signal, dft_backend)     # Custom DFT
 spectrum_modulated: np.ndarray = fft(modulated_signal)                      # SciPy FFT
 spectrum_modulated_inverse: np.ndarray = ifft(spectrum_modulated)           # SciPy IDFT
 spectrum_modulated_shifted: np.ndarray = fftshift(spectrum_modulated_dft)   # Shift DFT
@@ -136,6 +130,19 @@ plot_signal(t, np.real(spectrum_modulated_inverse),
             r'Magnitude',
             r'Inverse FFT Reconstruction')
 
+###################################################
+print(f"\n7. Comparing DFT Backends")
+print(f"=======================================\n")
+###################################################
+
+# Same transform on every backend: error against scipy.fft and time taken
+for N in (2 ** 10, 2 ** 12):
+    for name, (error, seconds) in compare_backends(np.random.randn(N)).items():
+        print(f"N = {N:5d}  {name:<7s} {seconds * 1e3:10.2f} ms  max error {error:.2e}")
+
+# Repeated lengths (forward and inverse alike) reuse the cached twiddle tables
+print(f"Twiddle cache: {TWIDDLE_CACHE.stats()}")
+
 ###################################################
 print("\nSimulation complete!")
 print("=======================================\n")
@@ -1,27 +1,17 @@
 """ ex1.py """
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.fft import fft, ifft, fftshift
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from transforms import TWIDDLE_CACHE, compare_backends, dft, idft
 
-def dft(_s: np.ndarray) -> np.ndarray:
-    """Efficient Discrete Fourier Transform (DFT) using vectorized NumPy operations."""
-    _K: int = len(_s)
-    _n = np.arange(_K)
-    _k = _n.reshape((_K, 1))
-    exponent = np.exp(-2j * np.pi * _k * _n / _K)
-    return np.dot(exponent, _s)
-
-
-def idft(_S: np.ndarray) -> np.ndarray:
-    """Efficient Inverse Discrete Fourier Transform (IDFT)."""
-    _K: int = len(_S)
-    _n = np.arange(_K)
-    _k = _n.reshape((_K, 1))
-    exponent = np.exp(2j * np.pi * _k * _n / _K)
-    return np.dot(exponent, _S) / _K
-
+# Any backend in transforms.DFT_BACKENDS: 'loop', 'matrix' (DFT matrix in bounded blocks, not N x N at once),
+# 'fft' (pure NumPy mixed-radix FFT) or 'scipy'
+dft_backend: str = 'matrix'
 
 file_path: str = '../data/noisy_signal.npz'
 data: np.lib.npyio.NpzFile = np.load(file_path)
@@ -38,7 +28,7 @@ plt.grid(True)
 plt.show()
 
 # DFT and FFT
-dft_result: np.ndarray = dft(noisy_signal)
+dft_result: np.ndarray = dft(noisy_signal, dft_backend)
 fft_result: np.ndarray = fft(noisy_signal)
 
 # Magnitude Spectrum
@@ -108,7 +98,7 @@ plt.grid(True)
 plt.show()
 
 # Reconstruct the Signal
-reconstructed_signal_idft: np.ndarray = np.real(idft(filtered_dft))
+reconstructed_signal_idft: np.ndarray = np.real(idft(filtered_dft, dft_backend))
 reconstructed_signal_ifft: np.ndarray = np.real(ifft(filtered_dft))
 
 plt.figure(figsize=(10, 4))
@@ -125,6 +115,13 @@ plt.legend()
 plt.grid(True)
 plt.show()
 
+# Cost at scale: the full N x N matrix would need 16 * N^2 bytes (1.6 GB at N = 10000)
+for name, (error, seconds) in compare_backends(np.random.randn(10000), ('matrix', 'fft', 'scipy')).items():
+    print(f"N = 10000  {name:<7s} {seconds * 1e3:10.2f} ms  max error {error:.2e}")
+
+# Repeated lengths (forward and inverse alike) reuse the cached twiddle tables
+print(f"Twiddle cache: {TWIDDLE_CACHE.stats()}")
+
 ###################################################
 print("\nSimulation complete!")
 print("=======================================\n")
@@ -1,12 +1,19 @@
 """ ex2.py """
 
+import os
+import sys
 import time
 import numpy as np
 import sounddevice as sd
 import matplotlib.pyplot as plt
-from scipy.fft import fft, ifft
 from scipy.io.wavfile import write
 
+from stft import StftProcessor, SpectralGate, lowpass_mask
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from snr_monitor import SnrMonitor
+from spectrum import band_mask, hermitian_weights, inverse_spectrum, spectrum
+
 
 def play_sound(_audio: np.ndarray, _sampling_rate: int, duration: float):
     """Play audio signal."""
@@ -17,16 +24,13 @@ def play_sound(_audio: np.ndarray, _sampling_rate: int, duration: float):
 
 
 def compute_fft(_signal: np.ndarray, _sampling_rate: int) -> tuple[np.ndarray, np.ndarray]:
-    """The FFT and frequency axis."""
-    N: int = len(_signal)
-    _freqs: np.ndarray = np.fft.fftfreq(N, 1 / _sampling_rate)
-    spectrum: np.ndarray = fft(_signal)
-    return _freqs, spectrum  # Ensure tuple return
+    """The FFT and frequency axis (one-sided rfft for a real signal)."""
+    return spectrum(_signal, _sampling_rate)
 
 def plot_spectrum(_freqs: np.ndarray, spectrum: np.ndarray, title: str):
     """Plot FFT magnitude spectrum."""
     plt.figure(figsize=(12, 4))
-    plt.plot(_freqs[:len(_freqs) // 2], np.abs(spectrum[:len(spectrum) // 2]))
+    plt.plot(_freqs[_freqs >= 0], np.abs(spectrum[_freqs >= 0]))
     plt.title(title, fontsize=14)
     plt.xlabel("Frequency (Hz)", fontsize=12)
     plt.ylabel("Magnitude", fontsize=12)
@@ -36,35 +40,27 @@ def plot_spectrum(_freqs: np.ndarray, spectrum: np.ndarray, title: str):
 
 def filter_fft(_original_fft: np.ndarray, _freqs: np.ndarray, _fc: int) -> np.ndarray:
     """Low-pass filter by zeroing out frequencies beyond fc."""
+    return np.where(band_mask(_freqs, _fc), _original_fft, 0).astype(np.complex128)
 
-    _filtered_fft: np.ndarray = np.zeros_like(_original_fft, dtype=np.complex128)
-
-    _fc = _fc if isinstance(_fc, (tuple, list)) else _fc
-    signal_indices = [int(i) for i, _f in enumerate(_freqs) if -_fc < np.real(_f) < _fc]
-
-    _filtered_fft[signal_indices] = _original_fft[signal_indices]
-    return _filtered_fft
 
+def compute_snr(_original_fft: np.ndarray, _freqs: np.ndarray, _fc: int, _noise_range: int,
+                _n: int) -> tuple[float, float]:
+    """Compute Signal-to-Noise Ratio (SNR) of the spectrum of an _n-sample signal and return it as a tuple."""
 
-def compute_snr(_original_fft: np.ndarray, _freqs: np.ndarray, _fc: int, _noise_range: int) -> tuple[float, float]:
-    """Compute Signal-to-Noise Ratio (SNR) and return it as a tuple."""
+    signal_mask: np.ndarray = band_mask(_freqs, _fc)
+    noise_mask: np.ndarray = band_mask(_freqs, _noise_range, _fc)
 
-    _fc = _fc if isinstance(_fc, (tuple, list)) else _fc
-    _noise_range = _noise_range if isinstance(_noise_range, (tuple, list)) else _noise_range
+    # A one-sided bin stands for itself and its mirror: weight the power sums as the full spectrum would
+    weights: np.ndarray = hermitian_weights(_n) if len(_freqs) != _n else np.ones(_n)
 
-    signal_indices = [int(i) for i, _f in enumerate(_freqs)
-                      if -_fc < np.real(_f) < _fc]
-    noise_indices = [int(i) for i, _f in enumerate(_freqs)
-                     if (-_noise_range < np.real(_f) < -_fc) or (_fc < _f < _noise_range)]
-
-    N_signal = len(signal_indices)
-    N_noise = len(noise_indices)
+    N_signal = np.sum(weights[signal_mask])
+    N_noise = np.sum(weights[noise_mask])
 
     if N_signal == 0 or N_noise == 0:
         raise ValueError("Signal or Noise index set is empty. Adjust frequency ranges.")
 
-    signal_power = np.sum(np.abs(_original_fft[signal_indices]) ** 2) / N_signal
-    noise_power = np.sum(np.abs(_original_fft[noise_indices]) ** 2) / N_noise
+    signal_power = np.sum(weights[signal_mask] * np.abs(_original_fft[signal_mask]) ** 2) / N_signal
+    noise_power = np.sum(weights[noise_mask] * np.abs(_original_fft[noise_mask]) ** 2) / N_noise
 
     snr = signal_power / noise_power
     snr_db = 10 * np.log10(snr)
@@ -116,7 +112,7 @@ fc: int = 500  # Hz - Cut-off frequency
 filtered_fft = filter_fft(fft_result, freqs, fc)
 
 # SNR before filtering
-compute_snr(fft_result, freqs, fc, 4000)
+compute_snr(fft_result, freqs, fc, 4000, len(noisy_sound))
 
 plot_spectrum(freqs, filtered_fft, r"$\text{Filtered FFT Magnitude (0-500 Hz)}$")
 
@@ -125,14 +121,48 @@ print(f"\n4. Inverse FFT to Reconstruct Filtered Sound")
 print(f"=======================================\n")
 ###################################################
 
-filtered_sound = np.real(ifft(filtered_fft))
+filtered_sound = np.real(inverse_spectrum(filtered_fft, len(noisy_sound)))
 
 # Normalize and save the filtered sound
 filtered_sound_int16 = normalize_audio(filtered_sound)
 write(out_file_path, fs, filtered_sound_int16)
 
 ###################################################
-print(f"\n5. Playing Filtered Sound")
+print(f"\n5. Streaming STFT Filtering (Bounded Memory)")
+print(f"=======================================\n")
+###################################################
+
+# The same low-pass, frame by frame as the samples arrive: memory is a few frames and the
+# delay nfft - hop samples, whatever the recording length
+block_size: int = 1024
+stft = StftProcessor(fs, 512, 128)
+lowpass = lowpass_mask(fc)
+
+def audio_blocks():
+    """The recording as it would arrive from a device, block_size samples at a time."""
+    return (noisy_sound[_i:_i + block_size] for _i in range(0, len(noisy_sound), block_size))
+
+streamed_sound: np.ndarray = np.concatenate(list(stft.stream(audio_blocks(), lowpass)))
+
+print(f"Latency: {stft.latency / fs * 1000:.1f} ms, "
+      f"max difference to the whole-file FFT filter: {np.max(np.abs(streamed_sound - filtered_sound)):.4f}")
+
+# Adaptive spectral subtraction on top of the low-pass, for noise that changes over time
+gate = SpectralGate()
+gated_sound: np.ndarray = np.concatenate(list(stft.stream(
+    audio_blocks(), lambda _spec, _freqs: lowpass(_spec, _freqs) * gate(_spec, _freqs))))
+compute_snr(compute_fft(gated_sound, fs)[1], freqs, fc, 4000, len(gated_sound))
+
+# SNR over time instead of one number per recording: Welch band powers every 0.25 s,
+# the three versions batched as channels of one stream
+snr_monitor = SnrMonitor(fs, (0, fc), (fc, 4000), 512, 256, 0.25)
+snr_times, snr_series = snr_monitor.process(np.stack((noisy_sound, streamed_sound, gated_sound)))
+for snr_time, (snr_noisy, snr_streamed, snr_gated) in zip(snr_times, snr_series.T):
+    print(f"t = {snr_time:5.2f} s  SNR noisy {snr_noisy:7.2f} dB, "
+          f"low-pass {snr_streamed:6.2f} dB, gated {snr_gated:6.2f} dB")
+
+###################################################
+print(f"\n6. Playing Filtered Sound")
 print(f"=======================================\n")
 ###################################################
 
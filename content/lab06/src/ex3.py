@@ -3,7 +3,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.image as image
-from scipy.fft import fft2, ifft2
+from scipy.fft import irfft2
+
+from image_filter import filter_directory, image_spectrum, radial_mask
 
 
 def rgb2gray(rgb: np.ndarray) -> np.ndarray:
@@ -39,31 +41,21 @@ print(f"\n2. Computing and Visualizing 2D FFT Spectrum")
 print(f"=======================================\n")
 ###################################################
 
-fft_img: np.ndarray = fft2(gray_img)
+# Real image: rfft2 keeps only the non-redundant half-plane, in single precision, on every core
+fft_img: np.ndarray = image_spectrum(gray_img)
 plot_image(np.log(np.abs(fft_img) + 1e-10),
-           r"$\text{2D FFT Spectrum}$", cmap='viridis')
+           r"$\text{2D FFT Spectrum (rfft2 half-plane)}$", cmap='viridis')
 
 ###################################################
 print(f"\n3. Creating Frequency Filters (High/Low Pass)")
 print(f"=======================================\n")
 ###################################################
 
-rows, cols = gray_img.shape
-crow, ccol = rows // 2, cols // 2
-
-fc_low: float = 0.2  # Low-frequency cutoff
-corner_size_row: int = int(crow * fc_low)
-corner_size_col: int = int(ccol * fc_low)
-
-# Low-pass mask (corners)
-low_freq_mask: np.ndarray = np.zeros((rows, cols), dtype=bool)
-low_freq_mask[:corner_size_row, :corner_size_col] = True    # Top-left
-low_freq_mask[:corner_size_row, -corner_size_col:] = True   # Top-right
-low_freq_mask[-corner_size_row:, :corner_size_col] = True   # Bottom-left
-low_freq_mask[-corner_size_row:, -corner_size_col:] = True  # Bottom-right
+fc_low: float = 0.2  # Cutoff radius, as a fraction of the Nyquist frequency
 
-# High-pass mask (all except corners)
-high_freq_mask: np.ndarray = ~low_freq_mask
+# Radial masks on the rfft2 grid, cached per image shape
+low_freq_mask: np.ndarray = radial_mask(gray_img.shape, 'low', fc_low)
+high_freq_mask: np.ndarray = radial_mask(gray_img.shape, 'high', fc_low)
 
 ###################################################
 print(f"\n4. Applying Frequency Filters")
@@ -84,15 +76,29 @@ print(f"=======================================\n")
 ###################################################
 
 # High-Frequency Image
-reconstructed_img_high_freq: np.ndarray = np.abs(ifft2(S2))
+reconstructed_img_high_freq: np.ndarray = np.abs(irfft2(S2, s=gray_img.shape))
 plot_image(reconstructed_img_high_freq,
            r"$\text{Reconstructed Image (High Frequencies)}$")
 
 # Low-Frequency Image
-reconstructed_img_low_freq: np.ndarray = np.abs(ifft2(S1))
+reconstructed_img_low_freq: np.ndarray = np.abs(irfft2(S1, s=gray_img.shape))
 plot_image(reconstructed_img_low_freq,
            r"$\text{Reconstructed Image (Low Frequencies)}$")
 
+###################################################
+print(f"\n6. Batch Filtering of an Image Directory")
+print(f"=======================================\n")
+###################################################
+
+# Set 1 to low-pass every image of batch_in_dir into batch_out_dir, one image per process
+use_batch: int = 0
+batch_in_dir: str = "../data"
+batch_out_dir: str = "../data/low_pass"
+
+if use_batch == 1 and __name__ == '__main__':
+    for out_path in filter_directory(batch_in_dir, batch_out_dir, 'low', fc_low):
+        print(f"Saved {out_path}")
+
 ###################################################
 print("\nSimulation complete!")
 print("=======================================\n")
@@ -0,0 +1,79 @@
+""" image_filter.py """
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import matplotlib.image as image
+import scipy.fft as sfft
+
+IMAGE_EXTENSIONS: tuple[str, ...] = ('.png', '.jpg', '.jpeg')
+
+
+@lru_cache(maxsize=32)
+def radial_mask(_shape: tuple[int, int], _kind: str, _cutoff: float, _cutoff_high: float | None = None) -> np.ndarray:
+    """float32 mask on the rfft2 grid of a (rows, cols) image, cached per shape and band.
+
+    The radius is normalised so that 1 is the Nyquist frequency along either axis.
+    'low' keeps r < _cutoff, 'high' keeps r >= _cutoff and 'band' keeps
+    _cutoff <= r < _cutoff_high.
+    """
+    _fy: np.ndarray = 2 * sfft.fftfreq(_shape[0])[:, None]
+    _fx: np.ndarray = 2 * sfft.rfftfreq(_shape[1])[None, :]
+    _r: np.ndarray = np.sqrt(_fy ** 2 + _fx ** 2)
+    if _kind == 'low':
+        _mask: np.ndarray = _r < _cutoff
+    elif _kind == 'high':
+        _mask = _r >= _cutoff
+    elif _kind == 'band':
+        _mask = (_r >= _cutoff) & (_r < _cutoff_high)
+    else:
+        raise ValueError(f"Unknown mask kind {_kind!r}: use 'low', 'high' or 'band'.")
+    _mask = _mask.astype(np.float32)
+    _mask.flags.writeable = False
+    return _mask
+
+
+def image_spectrum(_img: np.ndarray, _workers: int = -1) -> np.ndarray:
+    """Single-precision rfft2 over the first two axes (colour channels are transformed separately)."""
+    return sfft.rfft2(np.asarray(_img, dtype=np.float32), axes=(0, 1), workers=_workers)
+
+
+def filter_image(_img: np.ndarray,
+                 _kind: str,
+                 _cutoff: float,
+                 _cutoff_high: float | None = None,
+                 _workers: int = -1) -> np.ndarray:
+    """Grayscale (rows, cols) or colour (rows, cols, channels) image -> float32 image filtered with radial_mask."""
+    _mask: np.ndarray = radial_mask(_img.shape[:2], _kind, _cutoff, _cutoff_high)
+    _spec: np.ndarray = image_spectrum(_img, _workers)
+    _spec *= _mask if _spec.ndim == 2 else _mask[..., None]
+    return sfft.irfft2(_spec, s=_img.shape[:2], axes=(0, 1), workers=_workers)
+
+
+def _filter_file(_args: tuple[str, str, str, float, float | None]) -> str:
+    _in_path, _out_path, _kind, _cutoff, _cutoff_high = _args
+    _img: np.ndarray = image.imread(_in_path)
+    if np.issubdtype(_img.dtype, np.integer):
+        _img = _img / np.iinfo(_img.dtype).max  # JPEGs load as 0..255: scale to the [0, 1] range of PNGs
+    # One FFT thread per process: the pool already keeps every core busy
+    _filtered: np.ndarray = filter_image(_img[..., :3] if _img.ndim == 3 else _img, _kind, _cutoff, _cutoff_high, 1)
+    image.imsave(_out_path, np.clip(np.abs(_filtered), 0, 1), cmap='gray' if _filtered.ndim == 2 else None)
+    return _out_path
+
+
+def filter_directory(_in_dir: str,
+                     _out_dir: str,
+                     _kind: str,
+                     _cutoff: float,
+                     _cutoff_high: float | None = None,
+                     _processes: int | None = None) -> list[str]:
+    """Filter every image of _in_dir into a PNG of the same name in _out_dir, one image per pool process."""
+    os.makedirs(_out_dir, exist_ok=True)
+    _jobs: list[tuple[str, str, str, float, float | None]] = [
+        (os.path.join(_in_dir, _name), os.path.join(_out_dir, os.path.splitext(_name)[0] + '.png'),
+         _kind, _cutoff, _cutoff_high)
+        for _name in sorted(os.listdir(_in_dir)) if _name.lower().endswith(IMAGE_EXTENSIONS)]
+    with ProcessPoolExecutor(_processes) as _pool:
+        return list(_pool.map(_filter_file, _jobs))
@@ -0,0 +1,123 @@
+""" stft.py """
+
+from typing import Callable, Iterator
+
+import numpy as np
+import scipy.fft as sfft
+import scipy.signal as signal
+from numpy.lib.stride_tricks import sliding_window_view
+
+# (frame spectra of shape (frames, bins), bin frequencies) -> gains broadcastable to the spectra
+Mask = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+class StftProcessor:
+    """Streaming STFT -> per-frame spectral mask -> ISTFT with weighted overlap-add.
+
+    The synthesis window is the analysis window divided by the overlapped sum of
+    its squares, so any window/hop pair that never sums to zero reconstructs the
+    input exactly when the mask is 1. Blocks of any size go in and each output
+    sample comes out once every frame covering it is done, nfft - hop samples
+    (the latency) behind the input; flush() returns the tail, so the output has
+    the input's length and alignment. Memory is a few frames, whatever the
+    recording length.
+    """
+
+    def __init__(self, _fs: float, _nfft: int = 512, _hop: int = 128, _window: str = 'hann'):
+        if _nfft % _hop:
+            raise ValueError("The FFT length must be a multiple of the hop.")
+        self.fs: float = _fs
+        self.nfft: int = _nfft
+        self.hop: int = _hop
+        self.latency: int = _nfft - _hop
+        self.freqs: np.ndarray = sfft.rfftfreq(_nfft, 1 / _fs)
+
+        self.window: np.ndarray = signal.get_window(_window, _nfft)
+        _overlap: np.ndarray = np.sum((self.window ** 2).reshape(-1, _hop), axis=0)
+        if np.min(_overlap) <= 1e-10:
+            raise ValueError("Window and hop do not overlap-add to a non-zero sum.")
+        self.synthesis: np.ndarray = self.window / np.tile(_overlap, _nfft // _hop)
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the stream: the next block starts a new one."""
+        self._input: np.ndarray = np.zeros(self.latency)  # Samples not yet in a complete frame (zero-primed)
+        self._tail: np.ndarray = np.zeros(self.latency)   # Overlap-add sums still waiting for frames
+        self._skip: int = self.latency                    # Output of the priming zeros, dropped
+        self._pending: int = 0                            # Input samples not yet returned
+
+    def process(self, _x: np.ndarray, _mask: Mask | None = None) -> np.ndarray:
+        """Audio block -> the processed samples completed so far (self.latency behind the input)."""
+        _buffer: np.ndarray = np.concatenate((self._input, _x))
+        self._pending += len(_x)
+        _n_frames: int = max(0, (len(_buffer) - self.nfft) // self.hop + 1)
+        if _n_frames == 0:
+            self._input = _buffer
+            return _buffer[:0]
+
+        _frames: np.ndarray = sliding_window_view(_buffer, self.nfft)[::self.hop][:_n_frames] * self.window
+        _spec: np.ndarray = sfft.rfft(_frames, axis=1)
+        if _mask is not None:
+            _spec = _spec * _mask(_spec, self.freqs)
+        _y: np.ndarray = sfft.irfft(_spec, self.nfft, axis=1) * self.synthesis
+
+        # Overlap-add: hop-sized slice j of every frame lands j hops after the frame start
+        _out: np.ndarray = np.zeros(_n_frames * self.hop + self.latency)
+        _out[:self.latency] = self._tail
+        for _j in range(self.nfft // self.hop):
+            _out[_j * self.hop:_j * self.hop + _n_frames * self.hop] += \
+                _y[:, _j * self.hop:(_j + 1) * self.hop].ravel()
+
+        self._input = _buffer[_n_frames * self.hop:]
+        self._tail = _out[_n_frames * self.hop:]
+        _drop: int = min(self._skip, _n_frames * self.hop)
+        self._skip -= _drop
+        _ready: np.ndarray = _out[_drop:_n_frames * self.hop]
+        self._pending -= len(_ready)
+        return _ready
+
+    def flush(self, _mask: Mask | None = None) -> np.ndarray:
+        """The rest of the stream, completed with zero input; the processor is then reset."""
+        _pending: int = self._pending
+        _out: np.ndarray = self.process(np.zeros(self.nfft), _mask)[:_pending]
+        self.reset()
+        return _out
+
+    def stream(self, _blocks: Iterator[np.ndarray], _mask: Mask | None = None) -> Iterator[np.ndarray]:
+        """Process every block of a stream, then flush; the output has the input's length and alignment."""
+        for _block in _blocks:
+            yield self.process(_block, _mask)
+        yield self.flush(_mask)
+
+
+def lowpass_mask(_fc: float) -> Mask:
+    """Keep the bins below _fc Hz, zero the rest."""
+    return lambda _spec, _freqs: (_freqs < _fc).astype(np.float64)
+
+
+class SpectralGate:
+    """Spectral subtraction against a per-bin noise floor that follows the signal frame by frame.
+
+    The floor tracks the minimum of the time-smoothed power: it drops to a quieter
+    frame at once and rises by at most _rise per frame, so it settles on the noise
+    between notes/words and still follows noise that changes over the recording.
+    The gain is max(_floor, 1 - _over * noise / power) per bin.
+    """
+
+    def __init__(self, _smooth: float = 0.9, _rise: float = 1.05, _over: float = 2.0, _floor: float = 0.05):
+        self.smooth: float = _smooth
+        self.rise: float = _rise
+        self.over: float = _over
+        self.floor: float = _floor
+        self.power: np.ndarray | None = None
+        self.noise: np.ndarray | None = None
+
+    def __call__(self, _spec: np.ndarray, _freqs: np.ndarray) -> np.ndarray:
+        _gains: np.ndarray = np.empty(_spec.shape)
+        # Recursive per frame, but vectorised over bins
+        for _i, _p in enumerate(np.abs(_spec) ** 2):
+            self.power = _p if self.power is None else self.smooth * self.power + (1 - self.smooth) * _p
+            self.noise = self.power if self.noise is None else np.minimum(self.power, self.rise * self.noise)
+            _gains[_i] = np.maximum(self.floor, 1 - self.over * self.noise / np.maximum(self.power, 1e-30))
+        return _gains
@@ -5,6 +5,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.fft import fft
 
+from zoom_fft import ZoomFFT
+
 ###################################################
 print(f"\n1. Defining Signal Parameters")
 print(f"=======================================\n")
@@ -19,6 +21,7 @@ f2: int = 2000                  # Second sine wave frequency
 
 N: int = 8                      # Number of samples
 K: int = 64                     # Total DFT samples after zero-padding
+M: int = 512                    # Chirp-z evaluation points between 0 and fs / 2
 ts: float = 1 / fs              # Sampling time
 
 n: np.ndarray = np.arange(N)    # Sample indices
@@ -105,6 +108,22 @@ zero_pad_and_plot(s, N, r"DFT with Zero-Padding (16 Samples)")
 # Zero-padding (64 Samples)
 zero_pad_and_plot(s, K - N, r"DFT with Zero-Padding (64 Samples)")
 
+# Zero-padding only samples the DTFT more densely: the chirp-z transform evaluates it
+# directly on any grid, at O((N+M) log(N+M)) instead of an FFT of fs / df samples
+zoom: ZoomFFT = ZoomFFT(N, 0, fs / 2, M, fs)
+
+def plot_zoom(signal: np.ndarray, title: str):
+    """Plots the DTFT magnitude of a signal on the zoom grid (0 to fs / 2)."""
+    plt.figure(figsize=(10, 4))
+    plt.plot(zoom.freqs, np.abs(zoom(signal)), 'b-')
+    plt.title(title, fontsize=14)
+    plt.xlabel(r"Frequency (Hz)", fontsize=12)
+    plt.ylabel(r"Magnitude", fontsize=12)
+    plt.grid(True)
+    plt.show()
+
+plot_zoom(s, rf"Chirp-z Spectrum ({M} Points, 0 - {fs // 2} Hz)")
+
 ###################################################
 print(f"\n6. Comparing DFT with Different Frequencies")
 print(f"=======================================\n")
@@ -119,6 +138,12 @@ f1: int = 0
 f2: int = 2500
 _, _, s_2500 = generate_signal(f1, f2, A1, A2, n, ts)
 zero_pad_and_plot(s_2500, K - N, r"DFT with Zero-Padding (64 Samples) $f_2 = 2500$")
+plot_zoom(s_2500, r"Chirp-z Spectrum $f_2 = 2500$")
+
+peak_2000: float = zoom.freqs[np.argmax(np.abs(zoom(s_2000)))]
+peak_2500: float = zoom.freqs[np.argmax(np.abs(zoom(s_2500)))]
+print(f"Chirp-z peak: {peak_2000:.1f} Hz (f2 = 2000), {peak_2500:.1f} Hz (f2 = 2500), "
+      f"grid step {zoom.df:.2f} Hz vs {fs / K:.1f} Hz for K = {K}")
 
 print("\nDFT Analysis Completed!\n")
 
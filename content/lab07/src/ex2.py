@@ -5,6 +5,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.fft import fft, fftfreq
 
+from zoom_fft import ZoomFFT
+
 ###################################################
 print(f"\n1. Loading Signal Data")
 print(f"=======================================\n")
@@ -83,6 +85,34 @@ plot_spectrum(freqs_windowed, spectrum_windowed,
 
 print("\nFFT Analysis with Hanning Window Completed!\n")
 
+###################################################
+print(f"\n6. Zooming on the Strongest Note (Chirp-z)")
+print(f"=======================================\n")
+###################################################
+
+zoom_step: float = 0.05         # Hz, versus fs / N for the FFT bins
+bin_width: float = fs / len(notes_signal)
+
+peak_bin: float = freqs_windowed[np.argmax(spectrum_windowed)]
+zoom: ZoomFFT = ZoomFFT(len(notes_signal), peak_bin - 2 * bin_width, peak_bin + 2 * bin_width,
+                        int(round(4 * bin_width / zoom_step)) + 1, fs)
+zoom_spectrum: np.ndarray = np.abs(zoom(windowed_signal))
+peak_zoom: float = zoom.freqs[np.argmax(zoom_spectrum)]
+
+plt.figure(figsize=(10, 4))
+plt.plot(zoom.freqs, zoom_spectrum, 'b-', label=r"Chirp-z")
+plt.stem(freqs_windowed, spectrum_windowed, linefmt='r-', markerfmt='ro', basefmt=" ", label=r"FFT bins")
+plt.xlim(zoom.freqs[0], zoom.freqs[-1])
+plt.title(r"Zoomed Spectrum Around the Strongest Note", fontsize=14)
+plt.xlabel("Frequency (Hz)", fontsize=12)
+plt.ylabel("Magnitude", fontsize=12)
+plt.legend()
+plt.grid(True)
+plt.show()
+
+print(f"FFT peak: {peak_bin:.3f} Hz (bin width {bin_width:.3f} Hz), "
+      f"chirp-z peak: {peak_zoom:.3f} Hz ({zoom.m} points, {zoom.df:.3f} Hz step)")
+
 ###################################################
 print("=======================================\n")
 print("\nSimulation complete!")
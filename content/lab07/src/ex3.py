@@ -1,13 +1,17 @@
 """ ex3.py """
 
+import os
+import sys
 import time
 import numpy as np
 import sounddevice as sd
 import matplotlib.pyplot as plt
-from scipy.fft import fft
 from scipy.signal import windows
 from scipy.io.wavfile import write
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from spectrum import spectrum
+
 ###################################################
 print(f"\n1. Loading Signal Data")
 print(f"=======================================\n")
@@ -48,15 +52,13 @@ print(f"=======================================\n")
 ###################################################
 
 def compute_fft(_signal: np.ndarray, _fs: int) -> tuple[np.ndarray, np.ndarray]:
-    """Computes the FFT and corresponding frequency axis."""
-    spectrum = fft(_signal)
-    freqs = np.fft.fftfreq(len(_signal), d=1/_fs)
-    return freqs, spectrum
+    """Computes the FFT and corresponding frequency axis (one-sided rfft: the signal is real)."""
+    return spectrum(_signal, _fs)
 
 def plot_spectrum(_freqs: np.ndarray, _spectrum: np.ndarray, _title: str):
     """Generic function for plotting magnitude spectrum."""
     plt.figure(figsize=(10, 4))
-    plt.stem(_freqs[:len(_freqs) // 2], np.abs(_spectrum)[:len(_spectrum) // 2], basefmt=" ")
+    plt.stem(_freqs[_freqs >= 0], np.abs(_spectrum)[_freqs >= 0], basefmt=" ")
     plt.title(_title, fontsize=14)
     plt.xlabel(r"$\text{Frequency (Hz)}$", fontsize=12)
     plt.ylabel(r"$\text{Magnitude}$", fontsize=12)
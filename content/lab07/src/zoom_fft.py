@@ -0,0 +1,46 @@
+""" zoom_fft.py """
+
+import numpy as np
+import scipy.fft as sfft
+
+
+class ZoomFFT:
+    """Chirp-z (Bluestein) spectrum of length-N signals on M points f0, f0 + df, ..., f1.
+
+    X[m] = sum_n x[n] exp(-j*2*pi*(f0 + m*df)*n/fs). With n*m = (n^2 + m^2 - (m-n)^2) / 2
+    the sum becomes a chirp-modulated convolution, done with one FFT of length
+    L >= N + M - 1: O((N+M) log(N+M)) per signal, whatever the grid spacing, instead
+    of zero-padding to fs / df samples. The chirps and the FFT of the convolution
+    kernel depend only on (N, f0, f1, M, fs), so a plan is built once and reused.
+    """
+
+    def __init__(self, _n: int, _f0: float, _f1: float, _m: int = 1024, _fs: float = 2.0):
+        self.n: int = _n
+        self.m: int = _m
+        self.fs: float = _fs
+        self.freqs: np.ndarray = np.linspace(_f0, _f1, _m)
+        self.df: float = (_f1 - _f0) / (_m - 1) if _m > 1 else 0.0
+        self.fft_len: int = sfft.next_fast_len(_n + _m - 1)
+
+        # Half-angle chirp exp(-j*pi*df/fs * k^2), long enough for both index ranges
+        _k: np.ndarray = np.arange(max(_n, _m), dtype=np.float64)
+        _chirp: np.ndarray = np.exp(-1j * np.pi * self.df / _fs * _k ** 2)
+        # Input weights: start of the band and the first chirp
+        self.pre: np.ndarray = np.exp(-2j * np.pi * _f0 / _fs * np.arange(_n)) * _chirp[:_n]
+        self.post: np.ndarray = _chirp[:_m]
+        # Kernel conj(chirp) at lags -(N-1)..(M-1), laid out circularly
+        _kernel: np.ndarray = np.zeros(self.fft_len, dtype=np.complex128)
+        _kernel[:_m] = np.conj(_chirp[:_m])
+        _kernel[self.fft_len - _n + 1:] = np.conj(_chirp[1:_n][::-1])
+        self.kernel_fft: np.ndarray = sfft.fft(_kernel)
+
+    def __call__(self, _x: np.ndarray) -> np.ndarray:
+        """Complex spectrum at self.freqs, along the last axis of _x (which must have N samples)."""
+        _y: np.ndarray = sfft.fft(np.asarray(_x) * self.pre, self.fft_len, axis=-1)
+        return sfft.ifft(_y * self.kernel_fft, axis=-1)[..., :self.m] * self.post
+
+
+def zoom_fft(_x: np.ndarray, _f0: float, _f1: float, _m: int = 1024, _fs: float = 2.0) -> tuple[np.ndarray, np.ndarray]:
+    """One-off (frequencies, complex spectrum) of _x on _m points between _f0 and _f1 Hz."""
+    _plan: ZoomFFT = ZoomFFT(np.shape(_x)[-1], _f0, _f1, _m, _fs)
+    return _plan.freqs, _plan(_x)
@@ -1,31 +1,60 @@
 """ RTL_SDR.py """
 
+import os
+import sys
+import asyncio
 import numpy as np
 import matplotlib.pyplot as plt
 import scipy.signal as signal
-from scipy.fftpack import fft
 from scipy.io.wavfile import write
 
 from rtlsdr import RtlSdr
 import sounddevice as sd
 
+from channelizer import demodulate_all
+from fm_receiver import FmReceiver, WavWriter, iter_blocks
+from fm_stereo import StereoDecoder
+from iq_file import IqCapture, IqWriter, load_capture
+from rds import RdsDecoder
+from spectrogram import StftPlan, save_psd, save_spectrogram
+from resampler import PolyphaseResampler
+from rtl_tcp import CaptureStats, capture_rtl_tcp
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from snr_monitor import SnrMonitor
+from spectrum import spectrum
+
 # File paths for input/output data
 root: str = "../data"
-in_file: str = f"{root}/x1.npy"
+in_file: str = f"{root}/x1.iq"
+in_file_npy: str = f"{root}/x1.npy"  # Legacy complex128 capture, used when x1.iq does not exist
 out_file: str = f"{root}/x1.wav"
+out_stereo_file: str = f"{root}/x1_stereo.wav"
 out_spectrum_png: str = f"{root}/spectrum_signal.png"
 out_filtered_spectrum_png: str = f"{root}/filtered_spectrum_signal.png"
 out_dec_dem_png: str = f"{root}/decimated_demodulated_signal.png"
 out_dem_fm_png: str = f"{root}/demodulated_signal.png"
 demodulated_signal_psd: str = f"{root}/demodulated_signal_psd.png"
 out_dem_fm_mono_channel_png: str = f"{root}/out_dem_fm_mono_channel_signal.png"
+out_station_pattern: str = f"{root}/station_{{mhz:.1f}}MHz.wav"
 
 # Set plot configurations
 plt.rcParams['figure.dpi'] = 170
 plt.rcParams['figure.figsize'] = (8, 4)
 
-# Set 1 if using an RTL-SDR device, 0 otherwise
+# Set 1 if using an RTL-SDR device, 2 for an rtl_tcp server (e.g. rtl_tcp.py replaying x1.iq), 0 otherwise
 use_sdr: int = 0
+rtl_tcp_host: str = "127.0.0.1"
+rtl_tcp_port: int = 1234
+# Set 1 to demodulate block by block (O(block_size) memory, no plots), 0 for the full walkthrough
+use_stream: int = 0
+block_size: int = 2 ** 16
+# Set 1 to demodulate every FM station found in the capture (one WAV per station), 0 for F_station only
+use_all_stations: int = 0
+# Set 1 to decode L/R stereo from the 19 kHz pilot and 38 kHz L-R subcarrier in the streaming modes
+use_stereo: int = 0
+# Set 1 to decode RDS (station name, radiotext) from the 57 kHz subcarrier in the same streaming pass
+use_rds: int = 0
 
 # Frequency of the radio station to tune in to
 F_station: int = int(88.5e6)  # Trinitas FM frequency
@@ -34,9 +63,25 @@ F_station: int = int(88.5e6)  # Trinitas FM frequency
 Fs: int = 2280000  # Sampling frequency (in Hz)
 N: int = 8192000   # Number of samples
 
+# Remote capture: demodulation overlaps with acquisition through a bounded queue
+if use_sdr == 2:
+    receiver: FmReceiver = FmReceiver(Fs, _stereo=use_stereo == 1, _rds=use_rds == 1)
+    with WavWriter(out_file, receiver.fs_audio, receiver.channels) as wav:
+        stats: CaptureStats = asyncio.run(capture_rtl_tcp(rtl_tcp_host, rtl_tcp_port, receiver.process, Fs, F_station,
+                                                          _n_samples=N, _block_size=block_size,
+                                                          _on_output=wav.write))
+    print(stats.summary())
+    if receiver.rds is not None:
+        for record in receiver.rds.records:
+            print(record)
+
+    print("Finished!\n")
+    sys.exit(0)
+
 # Load or capture the signal
 if use_sdr == 0:
-    x1: np.ndarray = np.load(in_file)
+    # Memory-mapped: blocks are only converted to complex64 when they are read
+    x1: np.ndarray | IqCapture = load_capture(in_file if os.path.exists(in_file) else in_file_npy)
 else:
     # Initialize the RTL-SDR device
     sdr: RtlSdr = RtlSdr()
@@ -46,27 +91,54 @@ else:
     sdr.center_freq = F_station
     sdr.gain = 'auto'
 
-    # Read raw signal
-    x1: np.ndarray = sdr.read_samples(N)
-    np.save(in_file, x1)
+    # Read raw uint8 I/Q and store it as delivered (2 bytes per sample)
+    with IqWriter(in_file, Fs, F_station, sdr.gain) as iq_writer:
+        iq_writer.write_raw(sdr.read_bytes(2 * N))
+    x1: np.ndarray | IqCapture = load_capture(in_file)
 
     # Release the device resources
     sdr.close()
 
+# Channelizer: split the wideband capture into every 200 kHz station and demodulate them in one pass
+if use_all_stations == 1:
+    for station_file in demodulate_all(x1, Fs, F_station, out_station_pattern, block_size):
+        print(f"Saved {station_file}")
+
+    print("Finished!\n")
+    sys.exit(0)
+
+# Streaming receiver: fixed-size IQ blocks through every stage, filter state carried across block edges
+if use_stream == 1:
+    receiver: FmReceiver = FmReceiver(Fs, _stereo=use_stereo == 1, _rds=use_rds == 1)
+    # Reception quality over time: the mono band against the empty 75-95 kHz band above the MPX and RDS signals
+    snr_monitor: SnrMonitor = SnrMonitor(receiver.fs_new, (30, 15000), (75000, 95000), 2048, 1024, 1.0)
+    with WavWriter(out_file, receiver.fs_audio, receiver.channels) as wav:
+        for block in iter_blocks(x1, block_size):
+            x3_block: np.ndarray = receiver.baseband(block)
+            for snr_time, snr_db in zip(*snr_monitor.process(x3_block)):
+                print(f"t = {snr_time:6.2f} s  baseband SNR {snr_db:6.2f} dB")
+            wav.write(receiver.audio(x3_block))
+    if receiver.rds is not None:
+        for record in receiver.rds.records:
+            print(record)
+
+    print("Finished!\n")
+    sys.exit(0)
+
+# The walkthrough works on the whole capture at once
+x1 = np.asarray(x1)
+
 # Plot the spectrogram of the signal
-plt.figure()
-plt.specgram(x1, NFFT=2**10, Fs=Fs)
-plt.title('Spectrogram of the Signal (X1)')
-plt.ylim(-Fs / 2, Fs / 2)
-plt.ticklabel_format(style='plain')
-plt.savefig(out_spectrum_png)
-plt.close()
+# The STFT plan is reused for x1f; segments are max-pooled down to the image width and drawn on an Agg canvas
+stft_plan: StftPlan = StftPlan(2**10, Fs)
+save_spectrogram(out_spectrum_png, x1, stft_plan, 'Spectrogram of the Signal (X1)')
 
 # FM signals are transmitted with a bandwidth of 200 kHz
 f_bw: int = 200000
 
 # Filter the signal
 # Create a low-pass digital filter using scipy.signal.firwin
+# (shown for the spectrogram only; the decimation below filters inside the resampler)
 
 # 1. Select the number of taps (coefficients) for the filter (try 8, 16, 32)
 ntaps: int = 32
@@ -79,31 +151,21 @@ b: np.ndarray = signal.firwin(ntaps, fcut1, window='hamming')
 x1f: np.ndarray = signal.lfilter(b, 1, x1)
 
 # Plot the spectrogram of the filtered signal
-plt.figure(figsize=(10, 4))
-plt.specgram(x1f, NFFT=2**10, Fs=Fs)
-plt.title('Spectrogram of the Signal (X1f)')
-plt.ylim(-Fs / 2, Fs / 2)
-plt.ticklabel_format(style='plain')
-plt.savefig(out_filtered_spectrum_png)
-plt.close()
+save_spectrogram(out_filtered_spectrum_png, x1f, stft_plan, 'Spectrogram of the Signal (X1f)', _figsize=(10, 4))
 
 # Decimation
 # Decimate (subsample) the signal to have a new sampling frequency equal to f_bw (i.e., fs' = f_bw)
+# The polyphase resampler fuses the anti-alias filter with the rate change and only computes
+# the samples it keeps; the rational ratio (5/57) lands exactly on f_bw
 
-dec_rate: int = int(Fs / f_bw)
-x2: np.ndarray = signal.decimate(x1f, dec_rate)
+front_end: PolyphaseResampler = PolyphaseResampler.from_rates(Fs, f_bw, 64)
+x2: np.ndarray = front_end.process(x1)
 
 # New sampling frequency
-Fs_new: float = Fs / dec_rate
+Fs_new: float = front_end.fs_out(Fs)
 
 # Plot the spectrogram of the decimated signal
-plt.figure(figsize=(4, 10))
-plt.specgram(x2, NFFT=2**10, Fs=Fs_new)
-plt.title('Spectrogram of the Signal (X2)')
-plt.ylim(-Fs_new / 2, Fs_new / 2)
-plt.ticklabel_format(style='plain')
-plt.savefig(out_dec_dem_png)
-plt.close()
+save_spectrogram(out_dec_dem_png, x2, StftPlan(2**10, Fs_new), 'Spectrogram of the Signal (X2)', _figsize=(4, 10))
 
 # Demodulate the FM signal
 # Demodulate the FM signal using a simple frequency discriminator
@@ -119,26 +181,20 @@ xx: np.ndarray = x2[:-1] * x2_int_conj
 x3: np.ndarray = np.angle(xx)
 
 # Visualize the obtained FM signal by displaying its power spectral density
-plt.figure()
-plt.psd(x3, NFFT=2048, Fs=Fs_new, color='blue')
-plt.title('Decimated and Demodulated FM Signal')
-plt.axvspan(0, 15000, color='red', alpha=0.2)
-plt.axvspan(19000 - 500, 19000 + 500, color='green', alpha=0.2)
-plt.axvspan(19000 * 2 - 15000, 19000 * 2 + 15000, color='orange', alpha=0.2)
-plt.axvspan(19000 * 3 - 1500, 19000 * 3 + 1500, color='blue', alpha=0.2)
-plt.savefig(demodulated_signal_psd)
-plt.close()
+save_psd(demodulated_signal_psd, x3, StftPlan(2048, Fs_new, 0, _two_sided=False),
+         'Decimated and Demodulated FM Signal',
+         [(0, 15000, 'red'),                                    # Mono L+R
+          (19000 - 500, 19000 + 500, 'green'),                  # Pilot
+          (19000 * 2 - 15000, 19000 * 2 + 15000, 'orange'),     # Stereo L-R
+          (19000 * 3 - 1500, 19000 * 3 + 1500, 'blue')])        # RDS
 
 # Calculate and display FFT of the demodulated signal
 
-# 1. Calculate FFT from x3 using scipy.fftpack.fft
-yf: np.ndarray = fft(x3)
+# 1. Calculate FFT from x3 (real, so only the rfft half between 0 and fs/2 is computed)
+xf, yf = spectrum(x3, Fs_new)
 # 2. Display the absolute value of the spectrum (np.abs) between 0 and fs/2
-nf: int = len(yf)
-# Note: You can use np.linspace to create a frequency vector between 0 and fs, useful for plotting
-xf: np.ndarray = np.linspace(0.0, float(Fs_new), nf)
 plt.figure()
-plt.plot(xf[:nf//2], np.abs(yf[:nf//2]))
+plt.plot(xf, np.abs(yf))
 plt.title('FFT Spectrum of the Demodulated FM Signal')
 plt.grid()
 plt.savefig(out_dem_fm_png)
@@ -154,21 +210,20 @@ b2: np.ndarray = signal.firwin(ntaps2, fcut2, window='hamming')
 x3f: np.ndarray = signal.lfilter(b2, 1, x3)
 
 # 2. Calculate and display FFT for the filtered signal and compare with FFT of the previous signal (unfiltered)
-yff: np.ndarray = fft(x3f)
-nff: int = len(yff)
-xff: np.ndarray = np.linspace(0.0, float(Fs_new), nff)
+xff, yff = spectrum(x3f, Fs_new)
 plt.figure()
-plt.plot(xff[:nff//2], 2.0 / nff * np.abs(yff[:nff//2]))
+plt.plot(xff, 2.0 / len(x3f) * np.abs(yff))
 plt.title('FFT Spectrum of the Demodulated FM Signal after Mono Channel Filtering')
 plt.grid()
 plt.savefig(out_dem_fm_mono_channel_png)
 plt.close()
 
-# 3. Decimate the signal to have the final sampling frequency of f_audio = 44,100 Hz for playback
+# 3. Resample the signal to the final sampling frequency of f_audio = 44,100 Hz for playback
+# Rational 441/2000 step with the 0-15 kHz mono low-pass folded into the resampler taps
 f_audio: int = 44100
-dec_audio: int = int(Fs_new / f_audio)
-Fs_audio: float = Fs_new / dec_audio
-xa: np.ndarray = signal.decimate(x3f, dec_audio)
+audio_resampler: PolyphaseResampler = PolyphaseResampler.from_rates(Fs_new, f_audio, 128, fmaxa / (f_audio / 2))
+Fs_audio: float = audio_resampler.fs_out(Fs_new)
+xa: np.ndarray = audio_resampler.process(x3)
 
 input("Press Enter to play audio from signal...")
 
@@ -177,5 +232,17 @@ xs: np.ndarray = np.int16(xa / np.max(np.abs(xa)) * 32767)
 sd.play(xs, f_audio)
 write(out_file, f_audio, xs)
 
+# 4. Stereo: track the 19 kHz pilot, regenerate the 38 kHz carrier and demodulate L-R next to L+R
+# (L-R is boosted by 1 / sinc(38 kHz / Fs_new) to undo the discriminator's roll-off)
+stereo: StereoDecoder = StereoDecoder(Fs_new, f_audio, fmaxa, 128, 1 / np.sinc(38000 / Fs_new))
+xlr: np.ndarray = stereo.process(x3)
+print(f"Pilot {stereo.pilot.f_pilot:.2f} Hz, level {stereo.pilot.level:.3f}")
+write(out_stereo_file, f_audio, np.int16(xlr / np.max(np.abs(xlr)) * 32767))
+
+# 5. RDS: BPSK data on the 57 kHz subcarrier (station name and radiotext)
+rds: RdsDecoder = RdsDecoder(Fs_new)
+for record in rds.process(x3):
+    print(f"RDS {record.kind} (PI {record.pi:04X}) at {record.time:.2f} s: {record.text!r}")
+
 print("Finished!\n")
 input("Press Enter to continue...")
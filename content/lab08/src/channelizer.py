@@ -0,0 +1,148 @@
+""" channelizer.py """
+
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+
+import numpy as np
+import scipy.signal as signal
+import scipy.fft as sfft
+from numpy.lib.stride_tricks import sliding_window_view
+
+from fm_receiver import FmReceiver, WavWriter, iter_blocks
+
+
+def find_stations(_x: np.ndarray,
+                  _fs: float,
+                  _center_freq: float,
+                  _f_bw: float = 200000,
+                  _spacing: float = 100000,
+                  _threshold_db: float = 10.0) -> list[float]:
+    """Absolute frequencies of FM channels on the _spacing grid that rise above the noise floor."""
+    _f, _psd = signal.welch(_x, _fs, nperseg=2 ** 12, return_onesided=False)
+    _floor: float = float(np.median(_psd))
+
+    _lo: float = np.ceil((_center_freq - _fs / 2 + _f_bw / 2) / _spacing) * _spacing
+    _hi: float = _center_freq + _fs / 2 - _f_bw / 2
+    _grid: np.ndarray = np.arange(_lo, _hi + 1, _spacing)
+    _in_band: np.ndarray = np.abs(_f[None, :] - (_grid[:, None] - _center_freq)) < _f_bw / 2
+    _power_db: np.ndarray = 10 * np.log10((_in_band * _psd).sum(axis=1) / _in_band.sum(axis=1) / _floor)
+
+    # Grid peaks only (a station also leaks into its neighbours' windows), strongest first;
+    # peaks closer than one channel bandwidth are the same station
+    _padded: np.ndarray = np.pad(_power_db, 1, constant_values=-np.inf)
+    _peak: np.ndarray = (_power_db >= _padded[:-2]) & (_power_db >= _padded[2:]) & (_power_db >= _threshold_db)
+    _stations: list[float] = []
+    for _i in np.argsort(_power_db)[::-1]:
+        if _peak[_i] and all(abs(_grid[_i] - _s) >= _f_bw for _s in _stations):
+            _stations.append(float(_grid[_i]))
+    return sorted(_stations)
+
+
+class FftChannelizer:
+    """Overlap-save FFT filter bank: one shared FFT per segment, one small IFFT per channel.
+
+    With fs_out / fs = p / q, each segment of nfft = q * k samples advances by
+    hop = nfft / 2 inputs. A channel takes the n_small = p * k bins around its
+    centre, weights them with the prototype low-pass and inverts them straight at
+    fs_out, so every extra channel costs an n_small-point IFFT instead of a
+    full-rate mixer, filter and resampler.
+    """
+
+    def __init__(self,
+                 _fs: float,
+                 _offsets: list[float],
+                 _fs_out: float,
+                 _min_nfft: int = 2 ** 13,
+                 _workers: int = -1):
+        _ratio: Fraction = Fraction(_fs_out / _fs).limit_denominator(10000)
+        _k: int = 2 * -(-_min_nfft // (2 * _ratio.denominator))  # Even, so hop and its outputs are whole
+        self.fs: float = _fs
+        self.fs_out: float = _fs * _ratio.numerator / _ratio.denominator
+        self.nfft: int = _ratio.denominator * _k
+        self.n_small: int = _ratio.numerator * _k
+        self.hop: int = self.nfft // 2
+        self.workers: int = _workers
+
+        # Prototype low-pass spanning the overlap (nfft - hop + 1 taps), passband just inside +-fs_out / 2
+        _h: np.ndarray = signal.firwin(self.nfft - self.hop + 1, 0.95 * self.fs_out / _fs, window=('kaiser', 8.0))
+        _small_bins: np.ndarray = np.fft.fftfreq(self.n_small, 1 / self.n_small).astype(int)
+        self._weights: np.ndarray = sfft.fft(_h, self.nfft)[_small_bins % self.nfft] * self.n_small / self.nfft
+
+        self.bins: np.ndarray = np.rint(np.asarray(_offsets) * self.nfft / _fs).astype(int)
+        self.offsets: np.ndarray = self.bins * _fs / self.nfft  # Offsets actually tuned (bin-quantised)
+        self._channel_bins: np.ndarray = (self.bins[:, None] + _small_bins[None, :]) % self.nfft
+        self._segment: int = 0  # Index of the next segment, for the per-channel phase correction
+
+        self._buffer: np.ndarray = np.zeros(self.nfft - self.hop, dtype=np.complex128)
+
+    def spectra(self, _block: np.ndarray) -> np.ndarray:
+        """FFT of every complete segment the new block finishes, shape (n_segments, nfft)."""
+        self._buffer = np.concatenate((self._buffer, _block))
+        _n_seg: int = (len(self._buffer) - (self.nfft - self.hop)) // self.hop
+        _segments: np.ndarray = sliding_window_view(self._buffer, self.nfft)[::self.hop][:_n_seg]
+        _spectra: np.ndarray = sfft.fft(_segments, axis=1, workers=self.workers)
+        self._buffer = self._buffer[_n_seg * self.hop:]
+        self._segment += _n_seg
+        return _spectra
+
+    def extract(self, _spectra: np.ndarray, _channel: int) -> np.ndarray:
+        """Channel baseband at fs_out from the segment spectra returned by spectra()."""
+        _y: np.ndarray = sfft.ifft(_spectra[:, self._channel_bins[_channel]] * self._weights, axis=1)
+        # Segment s starts s * hop samples in; undo the mixer phase that offset leaves, exactly mod nfft
+        _segments: np.ndarray = np.arange(self._segment - len(_spectra), self._segment, dtype=np.int64)
+        _turns: np.ndarray = (_segments * self.hop * self.bins[_channel]) % self.nfft
+        _phases: np.ndarray = np.exp(-2j * np.pi * _turns / self.nfft)
+        return (_y[:, self.n_small // 2:] * _phases[:, None]).ravel()
+
+    def process(self, _block: np.ndarray) -> list[np.ndarray]:
+        _spectra: np.ndarray = self.spectra(_block)
+        return [self.extract(_spectra, _c) for _c in range(len(self.bins))]
+
+
+class MultiStationReceiver:
+    """Demodulate every channel of an FftChannelizer into its own WAV file on a worker pool."""
+
+    def __init__(self,
+                 _fs: float,
+                 _center_freq: float,
+                 _stations: list[float],
+                 _out_pattern: str,
+                 _f_bw: float = 200000,
+                 _max_workers: int | None = None):
+        self.stations: list[float] = _stations
+        self.channelizer = FftChannelizer(_fs, [_s - _center_freq for _s in _stations], _f_bw)
+        self.receivers: list[FmReceiver] = [FmReceiver(self.channelizer.fs_out, _f_bw) for _ in _stations]
+        self.out_files: list[str] = [_out_pattern.format(mhz=_s / 1e6) for _s in _stations]
+        self.writers: list[WavWriter] = [WavWriter(_path, _r.fs_audio)
+                                         for _path, _r in zip(self.out_files, self.receivers)]
+        self._pool = ThreadPoolExecutor(_max_workers)
+
+    def _channel_task(self, _spectra: np.ndarray, _channel: int) -> None:
+        _baseband: np.ndarray = self.channelizer.extract(_spectra, _channel)
+        self.writers[_channel].write(self.receivers[_channel].process(_baseband))
+
+    def process(self, _block: np.ndarray) -> None:
+        _spectra: np.ndarray = self.channelizer.spectra(_block)
+        # Channels are independent; each one's state only advances once per block
+        list(self._pool.map(lambda _c: self._channel_task(_spectra, _c), range(len(self.stations))))
+
+    def close(self) -> None:
+        self._pool.shutdown()
+        for _writer in self.writers:
+            _writer.close()
+
+    def __enter__(self) -> 'MultiStationReceiver':
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+def demodulate_all(_x: np.ndarray, _fs: float, _center_freq: float, _out_pattern: str,
+                   _block_size: int = 2 ** 18, **_kwargs) -> list[str]:
+    """Find the stations in a capture and write one WAV per station in a single pass."""
+    _stations: list[float] = find_stations(np.asarray(_x[:min(len(_x), 2 ** 18)]), _fs, _center_freq, **_kwargs)
+    with MultiStationReceiver(_fs, _center_freq, _stations, _out_pattern) as _receiver:
+        for _block in iter_blocks(_x, _block_size):
+            _receiver.process(_block)
+    return _receiver.out_files
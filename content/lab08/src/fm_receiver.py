@@ -0,0 +1,113 @@
+""" fm_receiver.py """
+
+import wave
+from typing import Iterator
+
+import numpy as np
+
+from fm_stereo import StereoDecoder
+from rds import RdsDecoder
+from resampler import PolyphaseResampler
+
+
+def iter_blocks(_x: np.ndarray, _block_size: int) -> Iterator[np.ndarray]:
+    """Split a (possibly memory-mapped) capture into fixed-size blocks."""
+    for _start in range(0, len(_x), _block_size):
+        yield np.asarray(_x[_start:_start + _block_size])
+
+
+class Discriminator:
+    """Conjugate-product FM discriminator keeping one sample of history."""
+
+    def __init__(self):
+        self._last: np.ndarray | None = None
+
+    def process(self, _x: np.ndarray) -> np.ndarray:
+        if len(_x) == 0:
+            return np.zeros(0)
+        _ext: np.ndarray = _x if self._last is None else np.concatenate((self._last, _x))
+        self._last = _x[-1:].copy()
+        return np.angle(_ext[:-1] * np.conj(_ext[1:]))
+
+
+class FmReceiver:
+    """Block-based FM receiver: fused channel filter/decimation, discriminator, mono audio.
+
+    Both rate changes are rational polyphase resamplers, so fs_new lands exactly
+    on f_bw and fs_audio exactly on f_audio; the mono 15 kHz low-pass is folded
+    into the audio resampler taps. With _stereo, audio() returns (n, 2) L/R
+    blocks from a pilot-locked fm_stereo.StereoDecoder instead. With _rds, every
+    baseband block also feeds an rds.RdsDecoder, whose records collect in
+    self.rds.records as the stream goes.
+    """
+
+    def __init__(self,
+                 _fs: float,
+                 _f_bw: float = 200000,
+                 _f_audio: float = 44100,
+                 _f_mono: float = 15000,
+                 _ntaps: int = 64,
+                 _ntaps_audio: int = 128,
+                 _stereo: bool = False,
+                 _rds: bool = False):
+        self.fs: float = _fs
+        # Already-channelised input (e.g. from channelizer.FftChannelizer) skips the front end
+        self.front_end = PolyphaseResampler.from_rates(_fs, _f_bw, _ntaps) if _fs != _f_bw else None
+        self.fs_new: float = _fs if self.front_end is None else self.front_end.fs_out(_fs)
+        self.discriminator = Discriminator()
+        self.audio_resampler = PolyphaseResampler.from_rates(self.fs_new, _f_audio, _ntaps_audio,
+                                                             _f_mono / (min(self.fs_new, _f_audio) / 2))
+        self.fs_audio: float = self.audio_resampler.fs_out(self.fs_new)
+        # The one-sample phase difference is a boxcar at fs_new: L-R at 38 kHz comes out sinc(38k / fs_new) low
+        self.stereo = StereoDecoder(self.fs_new, _f_audio, _f_mono, _ntaps_audio,
+                                    1 / np.sinc(38000 / self.fs_new)) if _stereo else None
+        self.channels: int = 1 if self.stereo is None else 2
+        self.rds = RdsDecoder(self.fs_new) if _rds else None
+
+    def baseband(self, _block: np.ndarray) -> np.ndarray:
+        """IQ block -> demodulated FM baseband (x3) at fs_new."""
+        _x2: np.ndarray = _block if self.front_end is None else self.front_end.process(_block)
+        _x3: np.ndarray = self.discriminator.process(_x2)
+        if self.rds is not None:
+            self.rds.process(_x3)
+        return _x3
+
+    def audio(self, _x3: np.ndarray) -> np.ndarray:
+        """FM baseband block -> mono (or L/R) audio at fs_audio."""
+        if self.stereo is not None:
+            return self.stereo.process(_x3)
+        return self.audio_resampler.process(_x3)
+
+    def process(self, _block: np.ndarray) -> np.ndarray:
+        """IQ block -> audio block."""
+        return self.audio(self.baseband(_block))
+
+
+def demodulate(_x: np.ndarray, _fs: float, _block_size: int = 2 ** 16, **_kwargs) -> np.ndarray:
+    """Run a whole capture through a fresh FmReceiver and return the joined audio."""
+    _receiver = FmReceiver(_fs, **_kwargs)
+    return np.concatenate([_receiver.process(_block) for _block in iter_blocks(_x, _block_size)])
+
+
+class WavWriter:
+    """Incremental 16-bit WAV writer with a fixed full-scale gain; stereo blocks are (n, 2)."""
+
+    def __init__(self, _path: str, _fs: float, _channels: int = 1, _full_scale: float = np.pi):
+        self.full_scale: float = _full_scale
+        self._wav = wave.open(_path, 'wb')
+        self._wav.setnchannels(_channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(int(round(_fs)))
+
+    def write(self, _audio: np.ndarray) -> None:
+        _scaled: np.ndarray = np.clip(_audio / self.full_scale, -1.0, 1.0) * 32767
+        self._wav.writeframes(_scaled.astype('<i2').tobytes())
+
+    def close(self) -> None:
+        self._wav.close()
+
+    def __enter__(self) -> 'WavWriter':
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
@@ -0,0 +1,123 @@
+""" fm_stereo.py """
+
+import numpy as np
+import scipy.signal as signal
+
+from resampler import PolyphaseResampler
+
+
+class PilotTracker:
+    """Block-vectorised 19 kHz pilot tracker for the demodulated FM baseband.
+
+    Each block is mixed down by an NCO and low-passed/decimated in one polyphase
+    pass; the angle of every decimated output is the pilot phase error at the
+    centre of its filter window. The NCO frequency is corrected once per block
+    from the slope of those errors, and the pilot phase is interpolated back to
+    the full rate, so there is no per-sample loop.
+
+    process() returns the baseband delayed by the filter's group delay together
+    with the pilot phase of each of those samples.
+    """
+
+    def __init__(self,
+                 _fs: float,
+                 _f_pilot: float = 19000,
+                 _f_cut: float = 1000,
+                 _decim: int = 50,
+                 _ntaps: int = 401,
+                 _loop_gain: float = 0.5):
+        self.fs: float = _fs
+        self.decim: int = _decim
+        self.delay: int = (_ntaps - 1) // 2
+        self.loop_gain: float = _loop_gain
+        self.lowpass = PolyphaseResampler(1, _decim, _taps=signal.firwin(_ntaps, _f_cut, fs=_fs))
+        self.level: float = 0.0  # Pilot amplitude over the last block (~0 for a mono broadcast)
+
+        self._w: float = 2 * np.pi * _f_pilot / _fs  # NCO frequency (rad/sample)
+        self._phase: float = 0.0                     # NCO phase of the next input sample
+        self._m: int = 0                             # Pilot estimates produced so far
+
+        # NCO phase of every sample a future window can still be centred on, from index _nco_start
+        self._nco_start: int = -self.delay
+        self._nco: np.ndarray = self._w * np.arange(-self.delay, 0)
+        # Last estimate: (sample index, unwrapped phase error, pilot phase)
+        self._last: tuple[int, float, float] | None = None
+
+        self._out: int = 0                      # Index of the next delayed sample to emit
+        self._buffer: np.ndarray = np.zeros(0)  # Baseband from _out onwards, not yet emitted
+
+    @property
+    def f_pilot(self) -> float:
+        """Current NCO frequency in Hz."""
+        return self._w * self.fs / (2 * np.pi)
+
+    def process(self, _x3: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """FM baseband block -> (delayed baseband, pilot phase of each of its samples)."""
+        _nco: np.ndarray = self._phase + self._w * np.arange(len(_x3))
+        self._phase += self._w * len(_x3)
+        self._nco = np.concatenate((self._nco, _nco))
+        _est: np.ndarray = self.lowpass.process(_x3 * np.exp(-1j * _nco))
+        self._buffer = np.concatenate((self._buffer, _x3))
+        if len(_est) == 0:
+            return self._buffer[:0], np.zeros(0)
+
+        _centres: np.ndarray = np.arange(self._m, self._m + len(_est)) * self.decim - self.delay
+        self._m += len(_est)
+        _err: np.ndarray = np.angle(_est)
+        if self._last is not None:
+            _centres = np.concatenate(([self._last[0]], _centres))
+            _err = np.unwrap(np.concatenate(([self._last[1]], _err)))
+            _theta: np.ndarray = np.concatenate(([self._last[2]],
+                                                 self._nco[_centres[1:] - self._nco_start] + _err[1:]))
+        else:
+            _err = np.unwrap(_err)
+            _theta = self._nco[_centres - self._nco_start] + _err
+
+        self.level = 2 * float(np.mean(np.abs(_est)))
+        # First-order frequency loop: a residual slope in the phase error is a frequency offset
+        if len(_err) > 1:
+            self._w += self.loop_gain * (_err[-1] - _err[0]) / (_centres[-1] - _centres[0])
+
+        # Drop NCO phases no future window is centred on
+        _first: int = self._m * self.decim - self.delay
+        self._nco = self._nco[_first - self._nco_start:]
+        self._nco_start = _first
+
+        # Emit the delayed samples up to the newest estimate, pilot phase interpolated between estimates
+        _n_out: int = max(0, int(_centres[-1]) + 1 - self._out)
+        _phase: np.ndarray = np.interp(np.arange(self._out, self._out + _n_out), _centres, _theta)
+        _delayed: np.ndarray = self._buffer[:_n_out]
+        self._buffer = self._buffer[_n_out:]
+        self._out += _n_out
+        self._last = (int(_centres[-1]), float(_err[-1]), float(_theta[-1]))
+        return _delayed, _phase
+
+
+class StereoDecoder:
+    """FM baseband -> L/R audio: pilot-locked 38 kHz L-R demodulation next to the mono L+R path.
+
+    Both paths run on the same delayed baseband through identical resamplers, so
+    L+R and L-R stay sample-aligned at fs_audio. _diff_gain rescales L-R against
+    L+R, e.g. to undo the discriminator's roll-off around 38 kHz.
+    """
+
+    def __init__(self,
+                 _fs: float,
+                 _f_audio: float = 44100,
+                 _f_mono: float = 15000,
+                 _ntaps_audio: int = 128,
+                 _diff_gain: float = 1.0):
+        self.pilot = PilotTracker(_fs)
+        self.diff_gain: float = _diff_gain
+        _cutoff: float = _f_mono / (min(_fs, _f_audio) / 2)
+        self.sum_resampler = PolyphaseResampler.from_rates(_fs, _f_audio, _ntaps_audio, _cutoff)
+        self.diff_resampler = PolyphaseResampler.from_rates(_fs, _f_audio, _ntaps_audio, _cutoff)
+        self.fs_audio: float = self.sum_resampler.fs_out(_fs)
+
+    def process(self, _x3: np.ndarray) -> np.ndarray:
+        """FM baseband block -> audio block of shape (n, 2), columns L and R."""
+        _x3d, _theta = self.pilot.process(_x3)
+        # Pilot sin(wt) = cos(theta) puts the subcarrier sin(2wt) at -sin(2 theta); x2 undoes the DSB halving
+        _sum: np.ndarray = self.sum_resampler.process(_x3d)
+        _diff: np.ndarray = self.diff_resampler.process(_x3d * (-2 * self.diff_gain * np.sin(2 * _theta)))
+        return np.column_stack((_sum + _diff, _sum - _diff))
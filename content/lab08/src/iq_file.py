@@ -0,0 +1,139 @@
+""" iq_file.py """
+
+import os
+import struct
+from typing import Iterator
+
+import numpy as np
+
+# 64-byte little-endian header: magic, version, sample format, Fs, center frequency, gain (NaN = auto), samples
+IQ_MAGIC: bytes = b"PSIQ"
+IQ_VERSION: int = 1
+IQ_HEADER: struct.Struct = struct.Struct("<4sHHdddQ24x")
+
+# Sample formats: raw dtype on disk and values per complex sample
+IQ_FORMATS: dict[str, tuple[int, np.dtype, int]] = {
+    'uint8': (0, np.dtype(np.uint8), 2),          # Interleaved offset-binary I/Q, as the RTL-SDR delivers it
+    'int8': (1, np.dtype(np.int8), 2),            # Interleaved signed I/Q
+    'complex64': (2, np.dtype(np.complex64), 1),
+}
+IQ_FORMAT_NAMES: dict[int, str] = {_code: _name for _name, (_code, _, _) in IQ_FORMATS.items()}
+
+
+def to_raw(_x: np.ndarray, _fmt: str) -> np.ndarray:
+    """Complex samples in [-1, 1] -> on-disk representation for _fmt."""
+    if _fmt == 'complex64':
+        return np.asarray(_x, dtype=np.complex64)
+    _iq: np.ndarray = np.empty(2 * len(_x), dtype=np.float32)
+    _iq[0::2] = np.real(_x)
+    _iq[1::2] = np.imag(_x)
+    if _fmt == 'uint8':
+        return np.clip(np.rint(_iq * 127.5 + 127.5), 0, 255).astype(np.uint8)
+    return np.clip(np.rint(_iq * 128), -128, 127).astype(np.int8)
+
+
+def from_raw(_raw: np.ndarray, _fmt: str) -> np.ndarray:
+    """On-disk representation for _fmt -> complex64 samples in [-1, 1]."""
+    if _fmt == 'complex64':
+        return np.array(_raw, dtype=np.complex64)
+    _iq: np.ndarray = _raw.astype(np.float32)
+    _iq = (_iq - 127.5) / 127.5 if _fmt == 'uint8' else _iq / 128
+    return _iq.view(np.complex64)
+
+
+class IqWriter:
+    """Append blocks to a capture file; the sample count in the header is patched on close."""
+
+    def __init__(self, _path: str, _fs: float, _center_freq: float, _gain: float | str = 'auto',
+                 _fmt: str = 'uint8'):
+        self.fmt: str = _fmt
+        self.n_samples: int = 0
+        self._header: tuple = (IQ_MAGIC, IQ_VERSION, IQ_FORMATS[_fmt][0], float(_fs), float(_center_freq),
+                               float('nan') if _gain == 'auto' else float(_gain))
+        self._file = open(_path, 'wb')
+        self._file.write(IQ_HEADER.pack(*self._header, 0))
+
+    def write(self, _x: np.ndarray) -> None:
+        """Append complex samples (converted to the file format)."""
+        self.write_raw(to_raw(_x, self.fmt))
+
+    def write_raw(self, _raw: np.ndarray | bytes) -> None:
+        """Append samples already in the file format, e.g. sdr.read_bytes() for 'uint8'."""
+        _raw = np.frombuffer(_raw, dtype=IQ_FORMATS[self.fmt][1]) if isinstance(_raw, bytes) else _raw
+        self._file.write(np.ascontiguousarray(_raw, dtype=IQ_FORMATS[self.fmt][1]).tobytes())
+        self.n_samples += len(_raw) // IQ_FORMATS[self.fmt][2]
+
+    def close(self) -> None:
+        self._file.seek(0)
+        self._file.write(IQ_HEADER.pack(*self._header, self.n_samples))
+        self._file.close()
+
+    def __enter__(self) -> 'IqWriter':
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+class IqCapture:
+    """Memory-mapped capture; slicing converts only the requested samples to complex64.
+
+    Supports len(), slicing and np.asarray(), so it can stand in for the in-memory
+    complex array anywhere the receivers take a capture.
+    """
+
+    def __init__(self, _path: str):
+        with open(_path, 'rb') as _f:
+            _magic, _version, _code, self.fs, self.center_freq, _gain, self.n_samples = \
+                IQ_HEADER.unpack(_f.read(IQ_HEADER.size))
+        if _magic != IQ_MAGIC or _version != IQ_VERSION:
+            raise ValueError(f"{_path} is not a version {IQ_VERSION} IQ capture.")
+        self.fmt: str = IQ_FORMAT_NAMES[_code]
+        self.gain: float | str = 'auto' if np.isnan(_gain) else _gain
+
+        _, _dtype, _per_sample = IQ_FORMATS[self.fmt]
+        self._per_sample: int = _per_sample
+        self.raw: np.ndarray = np.memmap(_path, dtype=_dtype, mode='r', offset=IQ_HEADER.size,
+                                          shape=(self.n_samples * _per_sample,))
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    def __getitem__(self, _key: slice) -> np.ndarray:
+        if not isinstance(_key, slice):
+            raise TypeError("IqCapture only supports slicing.")
+        _start, _stop, _step = _key.indices(self.n_samples)
+        if _step != 1:
+            return self[_start:_stop][::_step]
+        return from_raw(self.raw[_start * self._per_sample:_stop * self._per_sample], self.fmt)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        _x: np.ndarray = self[:]
+        return _x if dtype is None else _x.astype(dtype)
+
+    def blocks(self, _block_size: int) -> Iterator[np.ndarray]:
+        for _start in range(0, self.n_samples, _block_size):
+            yield self[_start:_start + _block_size]
+
+
+def save_capture(_path: str, _x: np.ndarray, _fs: float, _center_freq: float, _gain: float | str = 'auto',
+                 _fmt: str = 'uint8', _block_size: int = 2 ** 20) -> None:
+    """Write a whole (possibly memory-mapped) complex capture, block by block."""
+    with IqWriter(_path, _fs, _center_freq, _gain, _fmt) as _writer:
+        for _start in range(0, len(_x), _block_size):
+            _writer.write(np.asarray(_x[_start:_start + _block_size]))
+
+
+def load_capture(_path: str) -> np.ndarray | IqCapture:
+    """Open an IQ capture lazily; legacy complex128 .npy captures are memory-mapped as they are."""
+    if _path.endswith('.npy'):
+        return np.load(_path, mmap_mode='r')
+    return IqCapture(_path)
+
+
+if __name__ == "__main__":
+    # Convert the legacy complex128 capture (16 B/sample) to raw uint8 I/Q (2 B/sample)
+    in_npy: str = "../data/x1.npy"
+    out_iq: str = "../data/x1.iq"
+    save_capture(out_iq, np.load(in_npy, mmap_mode='r'), 2280000, 88.5e6)
+    print(f"{in_npy}: {os.path.getsize(in_npy) / 1e6:.1f} MB -> {out_iq}: {os.path.getsize(out_iq) / 1e6:.1f} MB")
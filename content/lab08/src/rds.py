@@ -0,0 +1,227 @@
+""" rds.py """
+
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.signal as signal
+from numpy.lib.stride_tricks import sliding_window_view
+
+from resampler import PolyphaseResampler
+
+RDS_CARRIER: float = 57000      # 3 x pilot
+RDS_SYMBOL_RATE: float = 1187.5  # 57 kHz / 48
+RDS_FS: float = 19000            # Decimated rate: 16 samples per symbol
+
+# 26-bit blocks: 16 information bits + 10-bit check word (generator x^10+x^8+x^7+x^5+x^4+x^3+1) xor an offset word.
+# Taken mod the generator, a received block leaves exactly its offset word.
+RDS_POLY: int = 0x5B9
+RDS_OFFSETS: dict[str, int] = {'A': 0x0FC, 'B': 0x198, 'C': 0x168, "C'": 0x350, 'D': 0x1B4}
+RDS_ORDER: tuple[str, ...] = ('A', 'B', 'C', 'D')
+# Syndrome -> position of the block in its group (C' counts as C), -1 for anything else
+RDS_BLOCK_INDEX: np.ndarray = np.full(1 << 10, -1, dtype=np.int64)
+RDS_BLOCK_INDEX[list(RDS_OFFSETS.values())] = [RDS_ORDER.index(_name[0]) for _name in RDS_OFFSETS]
+
+
+def _poly_mod(_value: int, _nbits: int) -> int:
+    for _bit in range(_nbits - 1, 9, -1):
+        if _value >> _bit & 1:
+            _value ^= RDS_POLY << (_bit - 10)
+    return _value
+
+
+# Syndrome contribution of each of the 26 bit positions, MSB first
+RDS_SYNDROME_TABLE: np.ndarray = np.array([_poly_mod(1 << (25 - _j), 26) for _j in range(26)], dtype=np.int64)
+
+
+def syndromes(_bits: np.ndarray) -> np.ndarray:
+    """Syndrome of the 26-bit window starting at every bit position (len(_bits) - 25 values)."""
+    if len(_bits) < 26:
+        return np.zeros(0, dtype=np.int64)
+    return np.bitwise_xor.reduce(sliding_window_view(_bits.astype(np.int64), 26) * RDS_SYNDROME_TABLE, axis=1)
+
+
+@dataclass
+class RdsRecord:
+    """Decoded station name ('ps') or radiotext, emitted whenever it completes or changes."""
+    kind: str
+    pi: int
+    text: str
+    time: float  # Seconds into the stream at the last bit of the completing group (symbol-sampling time)
+
+
+class RdsDecoder:
+    """Streaming RDS decoder on the demodulated FM baseband.
+
+    57 kHz mix-down and a 19 kHz polyphase resampler (16 samples per symbol),
+    carrier phase from the squared signal, biphase matched filter, symbol timing
+    from the matched-filter energy per sample phase, differential decoding, then
+    syndrome block sync and group 0A/0B (PS) and 2A/2B (radiotext) parsing. Only
+    the bit-level state machine loops in Python, at ~45 blocks per second.
+    """
+
+    def __init__(self, _fs: float, _ntaps: int = 384, _carrier_alpha: float = 1 / 256,
+                 _timing_decay: float = 0.99, _max_bad_blocks: int = 10):
+        self.fs: float = _fs
+        self.resampler = PolyphaseResampler.from_rates(_fs, RDS_FS, _ntaps, 2400 / (RDS_FS / 2))
+        self.sps: int = int(round(self.resampler.fs_out(_fs) / RDS_SYMBOL_RATE))
+        self.carrier_alpha: float = _carrier_alpha
+        self.timing_decay: float = _timing_decay
+        self.max_bad_blocks: int = _max_bad_blocks
+        self.records: list[RdsRecord] = []
+
+        self._n: int = 0                                  # Baseband samples consumed
+        self._k: int = 0                                  # Decimated samples consumed
+        self._carrier_zi: np.ndarray = np.zeros(1, dtype=np.complex128)
+        self._carrier_angle: float = 0.0                  # Last unwrapped angle of the squared carrier
+        self._mf: np.ndarray = np.r_[np.ones(self.sps // 2), -np.ones(self.sps // 2)][::-1]
+        self._mf_history: np.ndarray = np.zeros(self.sps - 1)
+        self._energy: np.ndarray = np.zeros(self.sps)     # Matched-filter energy per sample phase
+        self._last_k: int = -self.sps                     # Decimated index of the last symbol taken
+        self._last_symbol: float = 1.0
+
+        self._bits: np.ndarray = np.zeros(0, dtype=np.uint8)
+        self._bit_times: np.ndarray = np.zeros(0)  # Seconds into the stream at which each bit's symbol was taken
+        self._synced: bool = False
+        self._expect: int = 0        # Index into RDS_ORDER of the next block
+        self._bad_blocks: int = 0
+        self._group: list[int | None] = []
+
+        self.pi: int | None = None
+        self._ps: list[str] = [' '] * 8
+        self._ps_seen: int = 0       # Bit mask of received PS segments
+        self._rt: list[str] = [' '] * 64
+        self._rt_seen: int = 0
+        self._rt_ab: int | None = None
+        self._last_text: dict[str, str] = {}
+
+    @property
+    def ps(self) -> str:
+        return ''.join(self._ps)
+
+    @property
+    def radiotext(self) -> str:
+        return ''.join(self._rt).split('\r')[0].rstrip()
+
+    def _symbols(self, _x3: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Baseband block -> (soft biphase symbols, one per symbol period; their times in seconds)."""
+        _n: np.ndarray = np.arange(self._n, self._n + len(_x3), dtype=np.int64)
+        self._n += len(_x3)
+        # Exact 57 kHz phase: reduce n * f mod fs before scaling
+        _z: np.ndarray = self.resampler.process(_x3 * np.exp(-2j * np.pi * ((_n * RDS_CARRIER) % self.fs) / self.fs))
+
+        # BPSK carrier: squaring removes the data, a one-pole average tracks 2x the phase
+        _sq, self._carrier_zi = signal.lfilter([self.carrier_alpha], [1, self.carrier_alpha - 1], _z ** 2,
+                                               zi=self._carrier_zi)
+        _angle: np.ndarray = np.unwrap(np.concatenate(([self._carrier_angle], np.angle(_sq))))[1:]
+        if len(_angle):
+            self._carrier_angle = float(_angle[-1])
+        _r: np.ndarray = np.real(_z * np.exp(-0.5j * _angle))
+
+        # Biphase matched filter; timing is the sample phase with the most (slowly averaged) energy
+        _ext: np.ndarray = np.concatenate((self._mf_history, _r))
+        _y: np.ndarray = np.convolve(_ext, self._mf, mode='valid')
+        self._mf_history = _ext[len(_ext) - (self.sps - 1):]
+        _k: np.ndarray = np.arange(self._k, self._k + len(_y))
+        self._k += len(_y)
+        self._energy = self.timing_decay ** (len(_y) / self.sps) * self._energy + \
+            np.bincount(_k % self.sps, _y ** 2, minlength=self.sps)
+        # A timing change never takes two symbols less than half a period apart
+        _take: np.ndarray = _k[(_k % self.sps == int(np.argmax(self._energy))) & (_k > self._last_k + self.sps // 2)]
+        if len(_take):
+            self._last_k = int(_take[-1])
+        return (_y[_take - _k[0]] if len(_take) else _y[:0]), _take / self.resampler.fs_out(self.fs)
+
+    def _bits_from_symbols(self, _symbols: np.ndarray) -> np.ndarray:
+        """Differential decoding: a bit is 1 where the symbol sign changes."""
+        _signs: np.ndarray = np.concatenate(([self._last_symbol], np.sign(_symbols)))
+        if len(_symbols):
+            self._last_symbol = float(_signs[-1])
+        return (_signs[1:] != _signs[:-1]).astype(np.uint8)
+
+    def process(self, _x3: np.ndarray) -> list[RdsRecord]:
+        """FM baseband block at fs -> records completed within it (also appended to self.records)."""
+        _symbols, _times = self._symbols(_x3)
+        self._bits = np.concatenate((self._bits, self._bits_from_symbols(_symbols)))
+        self._bit_times = np.concatenate((self._bit_times, _times))
+        _new: list[RdsRecord] = []
+
+        while True:
+            if not self._synced:
+                # Two consecutive blocks whose offsets follow each other
+                _index: np.ndarray = RDS_BLOCK_INDEX[syndromes(self._bits)]
+                _hits: np.ndarray = np.flatnonzero((_index[:-26] >= 0) & (_index[26:] == (_index[:-26] + 1) % 4))
+                if len(_hits) == 0:
+                    self._bits = self._bits[max(0, len(self._bits) - 51):]
+                    self._bit_times = self._bit_times[len(self._bit_times) - len(self._bits):]
+                    break
+                self._bits = self._bits[_hits[0]:]
+                self._bit_times = self._bit_times[_hits[0]:]
+                self._synced, self._expect, self._bad_blocks = True, int(_index[_hits[0]]), 0
+                self._group = [None] * self._expect
+
+            if len(self._bits) < 26:
+                break
+            _block: int = int(np.dot(self._bits[:26].astype(np.int64), 1 << np.arange(25, -1, -1)))
+            _t: float = float(self._bit_times[25])
+            self._bits = self._bits[26:]
+            self._bit_times = self._bit_times[26:]
+            _valid: bool = RDS_BLOCK_INDEX[_poly_mod(_block, 26)] == self._expect
+            self._bad_blocks = 0 if _valid else self._bad_blocks + 1
+            self._group.append(_block >> 10 if _valid else None)
+            self._expect = (self._expect + 1) % 4
+            if self._expect == 0:
+                _new.extend(self._decode_group(self._group, _t))
+                self._group = []
+            if self._bad_blocks >= self.max_bad_blocks:
+                self._synced = False
+                self._group = []
+
+        self.records.extend(_new)
+        return _new
+
+    def _decode_group(self, _group: list[int | None], _t: float) -> list[RdsRecord]:
+        _a, _b, _c, _d = _group
+        if _b is None:
+            return []
+        _pi: int | None = _a if _a is not None else (_c if _b >> 11 & 1 and _c is not None else None)
+        if _pi is not None:
+            self.pi = _pi
+        _type: int = _b >> 12
+        _version_b: bool = bool(_b >> 11 & 1)
+
+        if _type == 0 and _d is not None:
+            _seg: int = _b & 0x3
+            self._ps[2 * _seg:2 * _seg + 2] = _chars(_d)
+            self._ps_seen |= 1 << _seg
+            if self._ps_seen == 0xF:
+                return self._emit('ps', self.ps, _t)
+        elif _type == 2:
+            _ab: int = _b >> 4 & 1
+            if self._rt_ab is not None and _ab != self._rt_ab:
+                self._rt, self._rt_seen = [' '] * 64, 0
+            self._rt_ab = _ab
+            _seg = _b & 0xF
+            if _version_b and _d is not None:
+                self._rt[2 * _seg:2 * _seg + 2] = _chars(_d)
+            elif not _version_b and _c is not None and _d is not None:
+                self._rt[4 * _seg:4 * _seg + 4] = _chars(_c) + _chars(_d)
+            else:
+                return []
+            self._rt_seen |= 1 << _seg
+            # Complete once every segment up to the one holding the carriage return has arrived
+            _text: str = ''.join(self._rt)
+            _width: int = 2 if _version_b else 4
+            _last: int = _text.index('\r') // _width if '\r' in _text else 15
+            if self._rt_seen & ((1 << (_last + 1)) - 1) == (1 << (_last + 1)) - 1:
+                return self._emit('radiotext', self.radiotext, _t)
+        return []
+
+    def _emit(self, _kind: str, _text: str, _t: float) -> list[RdsRecord]:
+        if self._last_text.get(_kind) == _text:
+            return []
+        self._last_text[_kind] = _text
+        return [RdsRecord(_kind, self.pi if self.pi is not None else 0, _text, _t)]
+
+
+def _chars(_word: int) -> list[str]:
+    return [chr(_word >> 8 & 0xFF), chr(_word & 0xFF)]
@@ -0,0 +1,82 @@
+""" resampler.py """
+
+from fractions import Fraction
+from math import gcd
+
+import numpy as np
+import scipy.signal as signal
+
+
+def design_taps(_up: int, _down: int, _taps_per_phase: int, _cutoff: float = 1.0, _beta: float = 5.0) -> np.ndarray:
+    """Kaiser-windowed low-pass for an up/down resampler, scaled by up.
+
+    _cutoff is relative to the lower of the input and output Nyquist frequencies.
+    """
+    _numtaps: int = _taps_per_phase * _up
+    _fc: float = _cutoff / max(_up, _down)
+    return signal.firwin(_numtaps, _fc, window=('kaiser', _beta)) * _up
+
+
+class PolyphaseResampler:
+    """Fused FIR filter and rational up/down resampler that only computes the outputs it keeps.
+
+    Each block goes through signal.upfirdn, whose polyphase kernel evaluates one
+    branch (taps_per_phase MACs) per kept output. Enough input history is carried
+    between process() calls, starting on a multiple of `down` so the outputs stay
+    aligned with a one-shot upfirdn over the whole stream.
+    """
+
+    def __init__(self,
+                 _up: int,
+                 _down: int,
+                 _taps_per_phase: int = 32,
+                 _cutoff: float = 1.0,
+                 _taps: np.ndarray | None = None):
+        _g: int = gcd(_up, _down)
+        self.up: int = _up // _g
+        self.down: int = _down // _g
+
+        self.taps: np.ndarray = design_taps(self.up, self.down, _taps_per_phase, _cutoff) if _taps is None \
+            else np.asarray(_taps)
+        self.taps_per_phase: int = -(-len(self.taps) // self.up)
+
+        self._history: np.ndarray | None = None
+        self._g0: int = 0     # Global index of _history[0], always a multiple of down
+        self._n_in: int = 0   # Inputs consumed so far
+        self._m: int = 0      # Index of the next output sample
+
+    @classmethod
+    def from_rates(cls, _fs_in: float, _fs_out: float, _taps_per_phase: int = 32,
+                   _cutoff: float = 1.0, _max_denominator: int = 10000) -> 'PolyphaseResampler':
+        """Resampler for the closest rational approximation of fs_out / fs_in."""
+        _ratio: Fraction = Fraction(_fs_out / _fs_in).limit_denominator(_max_denominator)
+        return cls(_ratio.numerator, _ratio.denominator, _taps_per_phase, _cutoff)
+
+    def fs_out(self, _fs_in: float) -> float:
+        return _fs_in * self.up / self.down
+
+    def process(self, _x: np.ndarray) -> np.ndarray:
+        _x = np.asarray(_x)
+        if self._history is None:
+            self._history = np.zeros(0, dtype=np.result_type(self.taps, _x))
+
+        _buffer: np.ndarray = np.concatenate((self._history, _x))
+        _n_total: int = self._n_in + len(_x)
+        _m_end: int = (_n_total * self.up - 1) // self.down + 1 if _n_total > 0 else 0
+
+        _m_off: int = self._g0 // self.down * self.up
+        _y: np.ndarray = signal.upfirdn(self.taps, _buffer, self.up, self.down)[self._m - _m_off:_m_end - _m_off] \
+            if len(_buffer) else _buffer
+
+        # Keep every input the next window can reach, from a multiple of down onwards
+        _g0: int = max(0, (_n_total - (self.taps_per_phase - 1)) // self.down * self.down)
+        self._history = _buffer[_g0 - self._g0:]
+        self._g0 = _g0
+        self._n_in = _n_total
+        self._m = _m_end
+        return _y
+
+
+def resample(_x: np.ndarray, _up: int, _down: int, _taps_per_phase: int = 32, _cutoff: float = 1.0) -> np.ndarray:
+    """One-shot polyphase resampling of a whole array."""
+    return PolyphaseResampler(_up, _down, _taps_per_phase, _cutoff).process(_x)
@@ -0,0 +1,260 @@
+""" rtl_tcp.py """
+
+import asyncio
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from iq_file import IqCapture, from_raw, load_capture, to_raw
+
+# rtl_tcp wire protocol: 12-byte greeting, 5-byte big-endian commands, then raw interleaved uint8 I/Q
+RTL_TCP_MAGIC: bytes = b"RTL0"
+RTL_TCP_HEADER: struct.Struct = struct.Struct(">4sII")  # magic, tuner type, tuner gain count
+RTL_TCP_COMMAND: struct.Struct = struct.Struct(">BI")   # command id, parameter
+
+CMD_SET_FREQ: int = 0x01
+CMD_SET_SAMPLE_RATE: int = 0x02
+CMD_SET_GAIN_MODE: int = 0x03
+CMD_SET_GAIN: int = 0x04
+CMD_SET_FREQ_CORRECTION: int = 0x05
+CMD_SET_AGC_MODE: int = 0x08
+
+TUNER_R820T: int = 5
+
+
+def iq_to_uint8(_x: np.ndarray) -> np.ndarray:
+    """Complex samples in [-1, 1] -> interleaved uint8 I/Q, as delivered by the dongle."""
+    return to_raw(_x, 'uint8')
+
+
+def uint8_to_iq(_raw: bytes | np.ndarray) -> np.ndarray:
+    """Interleaved uint8 I/Q -> complex64 samples in [-1, 1]."""
+    return from_raw(np.frombuffer(_raw, dtype=np.uint8), 'uint8')
+
+
+class RtlTcpClient:
+    """Asyncio client for an rtl_tcp server (a real dongle or ReplayServer)."""
+
+    def __init__(self):
+        self.tuner_type: int = 0
+        self.gain_count: int = 0
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def connect(self, _host: str = "127.0.0.1", _port: int = 1234) -> None:
+        self._reader, self._writer = await asyncio.open_connection(_host, _port)
+        _magic, self.tuner_type, self.gain_count = RTL_TCP_HEADER.unpack(
+            await self._reader.readexactly(RTL_TCP_HEADER.size))
+        if _magic != RTL_TCP_MAGIC:
+            raise ConnectionError(f"Not an rtl_tcp server (greeting {_magic!r}).")
+
+    async def command(self, _cmd: int, _param: int) -> None:
+        self._writer.write(RTL_TCP_COMMAND.pack(_cmd, _param & 0xFFFFFFFF))
+        await self._writer.drain()
+
+    async def set_center_freq(self, _freq: float) -> None:
+        await self.command(CMD_SET_FREQ, int(_freq))
+
+    async def set_sample_rate(self, _fs: float) -> None:
+        await self.command(CMD_SET_SAMPLE_RATE, int(_fs))
+
+    async def set_gain(self, _gain: float | str) -> None:
+        """Gain in dB, or 'auto'."""
+        if _gain == 'auto':
+            await self.command(CMD_SET_GAIN_MODE, 0)
+        else:
+            await self.command(CMD_SET_GAIN_MODE, 1)
+            await self.command(CMD_SET_GAIN, int(round(float(_gain) * 10)))
+
+    async def read_block(self, _n_samples: int) -> np.ndarray | None:
+        """Next _n_samples complex64 samples, or None once the stream has ended."""
+        try:
+            _raw: bytes = await self._reader.readexactly(2 * _n_samples)
+        except asyncio.IncompleteReadError as _err:
+            _raw = _err.partial[:len(_err.partial) // 2 * 2]
+            if not _raw:
+                return None
+        return uint8_to_iq(_raw)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+
+class ReplayServer:
+    """Local rtl_tcp stand-in that streams a stored capture at a configurable real-time rate.
+
+    _rate is a multiple of real time (1.0 paces the stream at fs, 0 sends as fast as
+    the socket drains). Commands from clients are recorded in `commands`. Once the
+    capture is sent, a connection stays open until the client closes it, so
+    late commands never hit a closed socket.
+    """
+
+    def __init__(self, _x: np.ndarray, _fs: float, _rate: float = 1.0, _chunk_size: int = 2 ** 14,
+                 _loop: bool = False):
+        self.x: np.ndarray = _x
+        self.fs: float = _fs
+        self.rate: float = _rate
+        self.chunk_size: int = _chunk_size
+        self.loop: bool = _loop
+        self.commands: list[tuple[int, int]] = []
+        self._server: asyncio.base_events.Server | None = None
+        self._handlers: set[asyncio.Task] = set()
+
+    async def start(self, _host: str = "127.0.0.1", _port: int = 1234) -> int:
+        """Start listening and return the bound port (pass _port=0 for any free port)."""
+        self._server = await asyncio.start_server(self._handle, _host, _port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening, end every open connection and wait for their handlers to finish."""
+        if self._server is not None:
+            self._server.close()
+            for _task in self._handlers:
+                _task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    def _chunk_bytes(self, _start: int) -> bytes:
+        _stop: int = _start + self.chunk_size
+        if isinstance(self.x, IqCapture) and self.x.fmt == 'uint8':
+            # Raw dongle bytes go out exactly as stored, without a round trip through complex64
+            return self.x.raw[2 * _start:2 * _stop].tobytes()
+        return iq_to_uint8(np.asarray(self.x[_start:_stop])).tobytes()
+
+    async def _read_commands(self, _reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                _cmd, _param = RTL_TCP_COMMAND.unpack(await _reader.readexactly(RTL_TCP_COMMAND.size))
+                self.commands.append((_cmd, _param))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def _handle(self, _reader: asyncio.StreamReader, _writer: asyncio.StreamWriter) -> None:
+        _task: asyncio.Task = asyncio.current_task()
+        self._handlers.add(_task)
+        _commands: asyncio.Task = asyncio.create_task(self._read_commands(_reader))
+        try:
+            _writer.write(RTL_TCP_HEADER.pack(RTL_TCP_MAGIC, TUNER_R820T, 29))
+            _t0: float = time.perf_counter()
+            _sent: int = 0
+            while True:
+                for _start in range(0, len(self.x), self.chunk_size):
+                    _writer.write(self._chunk_bytes(_start))
+                    await _writer.drain()
+                    _sent += min(self.chunk_size, len(self.x) - _start)
+                    if self.rate > 0:
+                        _delay: float = _t0 + _sent / (self.fs * self.rate) - time.perf_counter()
+                        if _delay > 0:
+                            await asyncio.sleep(_delay)
+                if not self.loop:
+                    break
+            # Keep reading commands until the client hangs up
+            await _commands
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client gone, or stop() ending the connection
+        finally:
+            _commands.cancel()
+            _writer.close()
+            self._handlers.discard(_task)
+
+
+@dataclass
+class CaptureStats:
+    """Block accounting and end-to-end latency (receipt -> demodulated) of a capture."""
+    blocks_received: int = 0
+    blocks_dropped: int = 0
+    samples_received: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    def summary(self) -> str:
+        _lat: np.ndarray = np.array(self.latencies) * 1e3
+        _lat_text: str = (f"latency mean {_lat.mean():.2f} ms, p95 {np.percentile(_lat, 95):.2f} ms, "
+                          f"max {_lat.max():.2f} ms") if len(_lat) else "no blocks processed"
+        return (f"{self.blocks_received} blocks received, {self.blocks_dropped} dropped, "
+                f"{self.samples_received} samples; {_lat_text}")
+
+
+async def capture(_client: RtlTcpClient,
+                  _process: Callable[[np.ndarray], np.ndarray],
+                  _n_samples: int | None = None,
+                  _block_size: int = 2 ** 16,
+                  _queue_size: int = 8,
+                  _on_output: Callable[[np.ndarray], None] | None = None) -> CaptureStats:
+    """Read blocks from _client while _process runs in a worker thread on earlier ones.
+
+    Blocks go through a bounded queue; when the consumer falls behind and the queue
+    is full, the newest block is dropped (and counted) so acquisition never stalls.
+    """
+    _loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    _queue: asyncio.Queue = asyncio.Queue(maxsize=_queue_size)
+    _stats: CaptureStats = CaptureStats()
+
+    async def _produce() -> None:
+        while _n_samples is None or _stats.samples_received < _n_samples:
+            _want: int = _block_size if _n_samples is None else min(_block_size, _n_samples - _stats.samples_received)
+            _block: np.ndarray | None = await _client.read_block(_want)
+            if _block is None:
+                break
+            _stats.blocks_received += 1
+            _stats.samples_received += len(_block)
+            try:
+                _queue.put_nowait((time.perf_counter(), _block))
+            except asyncio.QueueFull:
+                _stats.blocks_dropped += 1
+        await _queue.put(None)
+
+    async def _consume() -> None:
+        while (_item := await _queue.get()) is not None:
+            _t_received, _block = _item
+            _out: np.ndarray = await _loop.run_in_executor(None, _process, _block)
+            _stats.latencies.append(time.perf_counter() - _t_received)
+            if _on_output is not None:
+                _on_output(_out)
+
+    await asyncio.gather(_produce(), _consume())
+    return _stats
+
+
+async def capture_rtl_tcp(_host: str, _port: int, _process: Callable[[np.ndarray], np.ndarray],
+                          _fs: float, _center_freq: float, _gain: float | str = 'auto',
+                          _n_samples: int | None = None, **_kwargs) -> CaptureStats:
+    """Connect to an rtl_tcp server, tune it and run capture()."""
+    _client: RtlTcpClient = RtlTcpClient()
+    await _client.connect(_host, _port)
+    try:
+        await _client.set_sample_rate(_fs)
+        await _client.set_center_freq(_center_freq)
+        await _client.set_gain(_gain)
+        return await capture(_client, _process, _n_samples, **_kwargs)
+    finally:
+        await _client.close()
+
+
+async def replay_benchmark(_x: np.ndarray, _fs: float, _process: Callable[[np.ndarray], np.ndarray],
+                           _rate: float = 1.0, **_kwargs) -> CaptureStats:
+    """Stream _x through a local ReplayServer into capture(); no radio required."""
+    _server: ReplayServer = ReplayServer(_x, _fs, _rate)
+    _port: int = await _server.start("127.0.0.1", 0)
+    try:
+        return await capture_rtl_tcp("127.0.0.1", _port, _process, _fs, 0, _n_samples=len(_x), **_kwargs)
+    finally:
+        await _server.stop()
+
+
+if __name__ == "__main__":
+    # Serve the stored capture on the default rtl_tcp port, in real time, until interrupted
+    async def _serve() -> None:
+        _capture: IqCapture = load_capture("../data/x1.iq")
+        _server: ReplayServer = ReplayServer(_capture, _capture.fs, _loop=True)
+        _port: int = await _server.start("127.0.0.1", 1234)
+        print(f"Replaying ../data/x1.iq on 127.0.0.1:{_port}...")
+        await asyncio.Event().wait()
+
+    asyncio.run(_serve())
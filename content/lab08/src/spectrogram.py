@@ -0,0 +1,132 @@
+""" spectrogram.py """
+
+import numpy as np
+import scipy.fft as sfft
+import scipy.signal as signal
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class StftPlan:
+    """Reusable STFT set-up (window, hop, scaling, frequency axis) for long or memory-mapped signals.
+
+    Segments are transformed a chunk at a time and pooled straight down to the
+    requested number of time columns, so memory follows the chunk and the image
+    size rather than the capture length. Scaling is a power spectral density, as
+    in plt.specgram / plt.psd.
+    """
+
+    def __init__(self,
+                 _nfft: int = 2 ** 10,
+                 _fs: float = 2.0,
+                 _noverlap: int = 128,
+                 _window: str = 'hann',
+                 _two_sided: bool = True,
+                 _chunk_segments: int = 2 ** 10,
+                 _workers: int = -1):
+        self.nfft: int = _nfft
+        self.fs: float = _fs
+        self.hop: int = _nfft - _noverlap
+        self.two_sided: bool = _two_sided
+        self.chunk_segments: int = _chunk_segments
+        self.workers: int = _workers
+
+        self.window: np.ndarray = signal.get_window(_window, _nfft).astype(np.float32)
+        self.scale: float = 1 / (_fs * float(np.sum(self.window.astype(float) ** 2)))
+        self.freqs: np.ndarray = sfft.fftshift(sfft.fftfreq(_nfft, 1 / _fs)) if _two_sided \
+            else sfft.rfftfreq(_nfft, 1 / _fs)
+
+    def n_segments(self, _n: int) -> int:
+        return max(0, (_n - self.nfft) // self.hop + 1)
+
+    def power(self, _x: np.ndarray, _s0: int, _s1: int) -> np.ndarray:
+        """PSD of segments _s0.._s1 of _x, shape (_s1 - _s0, len(freqs))."""
+        # Single precision is plenty for a dB image and halves the FFT work
+        _chunk: np.ndarray = np.asarray(_x[_s0 * self.hop:(_s1 - 1) * self.hop + self.nfft])
+        _chunk = _chunk.astype(np.complex64 if np.iscomplexobj(_chunk) else np.float32, copy=False)
+        _segments: np.ndarray = sliding_window_view(_chunk, self.nfft)[::self.hop] * self.window
+        if self.two_sided:
+            _spec: np.ndarray = sfft.fftshift(sfft.fft(_segments, axis=1, workers=self.workers), axes=1)
+            return np.abs(_spec) ** 2 * self.scale
+        _p: np.ndarray = np.abs(sfft.rfft(_segments, axis=1, workers=self.workers)) ** 2 * self.scale
+        _p[:, 1:(self.nfft + 1) // 2] *= 2  # Fold the negative frequencies of a real signal
+        return _p
+
+    def spectrogram(self, _x: np.ndarray, _width: int = 1024, _pool: str = 'max') -> tuple[np.ndarray, np.ndarray]:
+        """(column times, PSD of shape (len(freqs), columns)), pooling segments into at most _width columns.
+
+        _pool is 'max' (keeps short bursts visible) or 'mean'.
+        """
+        _n_seg: int = self.n_segments(len(_x))
+        _per_col: int = max(1, -(-_n_seg // _width))
+        _n_col: int = -(-_n_seg // _per_col)
+        _cols_per_chunk: int = max(1, self.chunk_segments // _per_col)
+        _image: np.ndarray = np.empty((_n_col, len(self.freqs)))
+
+        for _c0 in range(0, _n_col, _cols_per_chunk):
+            _c1: int = min(_n_col, _c0 + _cols_per_chunk)
+            _s0, _s1 = _c0 * _per_col, min(_n_seg, _c1 * _per_col)
+            _p: np.ndarray = self.power(_x, _s0, _s1)
+            _starts: np.ndarray = np.arange(0, _s1 - _s0, _per_col)
+            if _pool == 'max':
+                _image[_c0:_c1] = np.maximum.reduceat(_p, _starts, axis=0)
+            else:
+                _counts: np.ndarray = np.diff(np.append(_starts, _s1 - _s0))
+                _image[_c0:_c1] = np.add.reduceat(_p, _starts, axis=0) / _counts[:, None]
+
+        _times: np.ndarray = ((np.arange(_n_col) * _per_col + (_per_col - 1) / 2) * self.hop + self.nfft / 2) / self.fs
+        return _times, _image.T
+
+    def psd(self, _x: np.ndarray) -> np.ndarray:
+        """Welch PSD: the mean over every segment, accumulated chunk by chunk."""
+        _n_seg: int = self.n_segments(len(_x))
+        _total: np.ndarray = np.zeros(len(self.freqs))
+        for _s0 in range(0, _n_seg, self.chunk_segments):
+            _total += self.power(_x, _s0, min(_n_seg, _s0 + self.chunk_segments)).sum(axis=0)
+        return _total / max(1, _n_seg)
+
+
+def _figure(_figsize: tuple[float, float] | None) -> tuple[Figure, FigureCanvasAgg]:
+    # Agg canvas directly: no pyplot state and no GUI backend involved
+    _fig: Figure = Figure(figsize=_figsize)
+    return _fig, FigureCanvasAgg(_fig)
+
+
+def save_spectrogram(_path: str,
+                     _x: np.ndarray,
+                     _plan: StftPlan,
+                     _title: str,
+                     _width: int = 1024,
+                     _pool: str = 'max',
+                     _figsize: tuple[float, float] | None = None) -> None:
+    """Render the pooled spectrogram of _x (in dB) to a PNG."""
+    _, _image = _plan.spectrogram(_x, _width, _pool)
+    _fig, _canvas = _figure(_figsize)
+    _ax = _fig.add_subplot()
+    _df: float = _plan.fs / _plan.nfft
+    _ax.imshow(10 * np.log10(_image + 1e-30), aspect='auto', origin='lower', interpolation='nearest',
+               extent=(0, len(_x) / _plan.fs, _plan.freqs[0] - _df / 2, _plan.freqs[-1] + _df / 2))
+    _ax.set_title(_title)
+    _ax.ticklabel_format(axis='y', style='plain')
+    _fig.savefig(_path)
+
+
+def save_psd(_path: str,
+             _x: np.ndarray,
+             _plan: StftPlan,
+             _title: str,
+             _spans: list[tuple[float, float, str]] = (),
+             _color: str = 'blue',
+             _figsize: tuple[float, float] | None = None) -> None:
+    """Render the Welch PSD of _x (in dB/Hz) to a PNG, shading each (low, high, colour) span."""
+    _fig, _canvas = _figure(_figsize)
+    _ax = _fig.add_subplot()
+    _ax.plot(_plan.freqs, 10 * np.log10(_plan.psd(_x) + 1e-30), color=_color)
+    for _lo, _hi, _span_color in _spans:
+        _ax.axvspan(_lo, _hi, color=_span_color, alpha=0.2)
+    _ax.set_title(_title)
+    _ax.set_xlabel('Frequency')
+    _ax.set_ylabel('Power Spectral Density (dB/Hz)')
+    _ax.grid(True)
+    _fig.savefig(_path)
@@ -0,0 +1,201 @@
+""" convolution.py """
+
+import time
+from typing import Callable
+
+import numpy as np
+import scipy.fft as sfft
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Method name -> full linear convolution (x, h, block size) of 1-D arrays with len(x) >= len(h)
+CONVOLUTION_METHODS: dict[str, Callable[[np.ndarray, np.ndarray, int], np.ndarray]] = {}
+
+# Overlap-save/-add blocks transformed together: bounds the working memory for long signals
+CHUNK_BLOCKS: int = 64
+
+
+def register_method(_name: str) -> Callable:
+    """Decorator adding a convolution method to CONVOLUTION_METHODS."""
+    def _register(_method: Callable[[np.ndarray, np.ndarray, int], np.ndarray]) -> Callable:
+        CONVOLUTION_METHODS[_name] = _method
+        return _method
+    return _register
+
+
+def _transforms(_complex: bool) -> tuple[Callable, Callable]:
+    # Real inputs only need the rfft half of every spectrum
+    if _complex:
+        return sfft.fft, lambda _X, _n: sfft.ifft(_X, _n, axis=-1)
+    return sfft.rfft, lambda _X, _n: sfft.irfft(_X, _n, axis=-1)
+
+
+@register_method('direct')
+def _direct(_x: np.ndarray, _h: np.ndarray, _block: int) -> np.ndarray:
+    return np.convolve(_x, _h)
+
+
+@register_method('fft')
+def _fft(_x: np.ndarray, _h: np.ndarray, _block: int) -> np.ndarray:
+    _n: int = len(_x) + len(_h) - 1
+    _m: int = sfft.next_fast_len(_n, not np.iscomplexobj(_x) and not np.iscomplexobj(_h))
+    _forward, _inverse = _transforms(np.iscomplexobj(_x) or np.iscomplexobj(_h))
+    return _inverse(_forward(_x, _m) * _forward(_h, _m), _m)[:_n]
+
+
+def _overlap_save_valid(_ext: np.ndarray, _H: np.ndarray, _L: int, _block: int, _complex: bool) -> np.ndarray:
+    """'valid' convolution of _ext with the kernel whose _block-point spectrum is _H (len(_ext) - _L + 1 samples)."""
+    _forward, _inverse = _transforms(_complex)
+    _step: int = _block - _L + 1
+    _n_out: int = len(_ext) - _L + 1
+    _n_blocks: int = -(-_n_out // _step)
+    # Zeros after the end only feed outputs past _n_out, which are dropped
+    _padded: np.ndarray = np.concatenate((_ext, np.zeros(_n_blocks * _step + _L - 1 - len(_ext), dtype=_ext.dtype)))
+    _frames: np.ndarray = sliding_window_view(_padded, _block)[::_step]
+    _out: np.ndarray = np.empty(_n_blocks * _step, dtype=np.result_type(_ext, _H if _complex else _H.real))
+    for _b0 in range(0, _n_blocks, CHUNK_BLOCKS):
+        _y: np.ndarray = _inverse(_forward(_frames[_b0:_b0 + CHUNK_BLOCKS], axis=-1) * _H, _block)
+        # The first _L - 1 samples of every block are circular wrap-around
+        _out[_b0 * _step:(_b0 + len(_y)) * _step] = _y[:, _L - 1:].ravel()
+    return _out[:_n_out]
+
+
+@register_method('overlap_save')
+def _overlap_save(_x: np.ndarray, _h: np.ndarray, _block: int) -> np.ndarray:
+    _complex: bool = np.iscomplexobj(_x) or np.iscomplexobj(_h)
+    _forward, _ = _transforms(_complex)
+    # Zeros on both sides turn the 'valid' part into the full convolution
+    _zeros: np.ndarray = np.zeros(len(_h) - 1, dtype=_x.dtype)
+    return _overlap_save_valid(np.concatenate((_zeros, _x, _zeros)), _forward(_h, _block), len(_h), _block, _complex)
+
+
+@register_method('overlap_add')
+def _overlap_add(_x: np.ndarray, _h: np.ndarray, _block: int) -> np.ndarray:
+    _complex: bool = np.iscomplexobj(_x) or np.iscomplexobj(_h)
+    _forward, _inverse = _transforms(_complex)
+    _L: int = len(_h)
+    _step: int = _block - _L + 1
+    _n_blocks: int = -(-len(_x) // _step)
+    _H: np.ndarray = _forward(_h, _block)
+    _segments: np.ndarray = np.concatenate((_x, np.zeros(_n_blocks * _step - len(_x), dtype=_x.dtype))).reshape(-1, _step)
+    _out: np.ndarray = np.zeros((_n_blocks + 1) * _step, dtype=np.result_type(_x, _h))
+    for _b0 in range(0, _n_blocks, CHUNK_BLOCKS):
+        _y: np.ndarray = _inverse(_forward(_segments[_b0:_b0 + CHUNK_BLOCKS], _block, axis=-1) * _H, _block)
+        _b1: int = _b0 + len(_y)
+        _out[_b0 * _step:_b1 * _step] += _y[:, :_step].ravel()
+        # Each block's tail (_L - 1 <= _step samples) spills into the next block
+        _out[(_b0 + 1) * _step:(_b1 + 1) * _step].reshape(-1, _step)[:, :_L - 1] += _y[:, _step:]
+    return _out[:len(_x) + _L - 1]
+
+
+class CostModel:
+    """Estimated seconds per method: a per-method scale times its operation count.
+
+    Operation counts are N * L for the direct sum and M log2 M per transform for the
+    FFT methods; calibrate() times every method on this machine to set the scales.
+    Overlap-save/-add blocks are the power of two that minimises the cost per output.
+    """
+
+    def __init__(self):
+        # Seconds per counted operation, as measured by calibrate() on a typical x86 machine
+        self.scales: dict[str, float] = {'direct': 2.2e-10, 'fft': 1.1e-9, 'overlap_save': 1.7e-9, 'overlap_add': 1.8e-9}
+
+    @staticmethod
+    def _fft_ops(_m: int) -> float:
+        return _m * np.log2(max(_m, 2))
+
+    def block_size(self, _n: int, _l: int) -> int:
+        """Power-of-two FFT block for overlap-save/-add: at least 2L, no more than the signal needs."""
+        _limit: int = max(2 * _l, 1 << int(np.ceil(np.log2(_n + _l))))
+        _candidates: list[int] = [1 << _k for _k in range(max(1, int(np.ceil(np.log2(2 * _l)))), 1 + int(np.log2(_limit)))]
+        return min(_candidates, key=lambda _b: (2 * self._fft_ops(_b) + _b) / (_b - _l + 1))
+
+    def operations(self, _method: str, _n: int, _l: int) -> float:
+        if _method == 'direct':
+            return float(_n * _l)
+        if _method == 'fft':
+            _m: int = sfft.next_fast_len(_n + _l - 1)
+            return 3 * self._fft_ops(_m) + _m
+        _block: int = self.block_size(_n, _l)
+        _blocks: int = -(-(_n + _l - 1) // (_block - _l + 1))
+        return _blocks * (2 * self._fft_ops(_block) + _block + (_l - 1 if _method == 'overlap_add' else 0))
+
+    def estimate(self, _method: str, _n: int, _l: int) -> float:
+        return self.scales[_method] * self.operations(_method, _n, _l)
+
+    def choose(self, _n: int, _l: int) -> str:
+        """Cheapest method for a length-_n signal and length-_l kernel (_n >= _l)."""
+        return min(self.scales, key=lambda _method: self.estimate(_method, _n, _l))
+
+    def calibrate(self, _sizes: tuple[tuple[int, int], ...] = ((2 ** 14, 16), (2 ** 16, 128), (2 ** 17, 1024)),
+                  _repeats: int = 3) -> dict[str, float]:
+        """Time every method on random signals of _sizes (N, L) and set each scale to its median seconds per op."""
+        _rng = np.random.default_rng(0)
+        for _method in self.scales:
+            _ratios: list[float] = []
+            for _n, _l in _sizes:
+                _x, _h = _rng.standard_normal(_n), _rng.standard_normal(_l)
+                _block: int = self.block_size(_n, _l)
+                _best: float = np.inf
+                for _ in range(_repeats):
+                    _t0: float = time.perf_counter()
+                    CONVOLUTION_METHODS[_method](_x, _h, _block)
+                    _best = min(_best, time.perf_counter() - _t0)
+                _ratios.append(_best / self.operations(_method, _n, _l))
+            self.scales[_method] = float(np.median(_ratios))
+        return self.scales
+
+
+COST_MODEL: CostModel = CostModel()
+
+
+def convolve(_x: np.ndarray, _h: np.ndarray, _mode: str = 'full', _method: str = 'auto') -> np.ndarray:
+    """Linear convolution as np.convolve(_x, _h, _mode), by _method or the one COST_MODEL picks ('auto').
+
+    _mode is 'full', 'same' (centred, max(len) samples) or 'valid' (only complete overlaps).
+    """
+    _x, _h = np.atleast_1d(np.asarray(_x)), np.atleast_1d(np.asarray(_h))
+    if len(_x) < len(_h):
+        _x, _h = _h, _x  # Convolution commutes: the longer one is the signal
+    _n, _l = len(_x), len(_h)
+    if _method == 'auto':
+        _method = COST_MODEL.choose(_n, _l)
+    _full: np.ndarray = CONVOLUTION_METHODS[_method](_x, _h, COST_MODEL.block_size(_n, _l) if _method != 'direct' else 0)
+    if not (np.iscomplexobj(_x) or np.iscomplexobj(_h)):
+        _full = np.real(_full)
+
+    if _mode == 'full':
+        return _full
+    if _mode == 'same':
+        return _full[(_l - 1) // 2:(_l - 1) // 2 + _n]
+    if _mode == 'valid':
+        return _full[_l - 1:_n]
+    raise ValueError(f"Unknown mode {_mode!r}: use 'full', 'same' or 'valid'.")
+
+
+class OverlapSave:
+    """Streaming FIR filter by overlap-save: y = lfilter(_h, 1, x) over an unbounded stream.
+
+    Each block is filtered as soon as it arrives (no added latency) from the
+    previous len(_h) - 1 input samples and FFT blocks of a fixed size, so the cost
+    is O(log L) per sample and memory is one block plus the kernel spectrum.
+    """
+
+    def __init__(self, _h: np.ndarray, _block: int | None = None):
+        self.h: np.ndarray = np.atleast_1d(np.asarray(_h))
+        self.block: int = _block or COST_MODEL.block_size(16 * len(self.h), len(self.h))
+        self.complex: bool = np.iscomplexobj(self.h)
+        self.H: np.ndarray = _transforms(self.complex)[0](self.h, self.block)
+        self._history: np.ndarray = np.zeros(len(self.h) - 1, dtype=self.h.dtype)
+
+    def process(self, _x: np.ndarray) -> np.ndarray:
+        """Input block -> the same number of filtered samples."""
+        _x = np.asarray(_x)
+        if len(_x) == 0:
+            return _x.astype(np.result_type(_x, self.h))
+        if np.iscomplexobj(_x) and not self.complex:
+            self.complex = True
+            self.H = sfft.fft(self.h, self.block)
+        _ext: np.ndarray = np.concatenate((self._history, _x))
+        self._history = _ext[len(_ext) - (len(self.h) - 1):]
+        _y: np.ndarray = _overlap_save_valid(_ext, self.H, len(self.h), self.block, self.complex)
+        return _y if self.complex else np.real(_y)
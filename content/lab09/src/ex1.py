@@ -1,8 +1,11 @@
 """ ex1.py """
 
+import time
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import convolve
+from scipy.signal import convolve, firwin, lfilter
+
+from convolution import CONVOLUTION_METHODS, COST_MODEL, OverlapSave, convolve as convolution_engine
 
 ###################################################
 print(f"\n1. Performing Manual Convolution")
@@ -13,11 +16,8 @@ print(f"=======================================\n")
 x: np.ndarray = np.array([1, 3, 5, 7, 5, 4, 2])
 h: np.ndarray = np.array([0.1, 0.3, 0.1])
 
-# Manual Convolution
-y_manual: list[float] = []
-for n in range(len(x) - len(h) + 1):
-    y_n: float = sum(h[k] * x[n + k] for k in range(len(h)))
-    y_manual.append(y_n)
+# Manual Convolution: y(n) = sum_k h(k) x(n + k) over complete overlaps, i.e. the 'valid' convolution with h reversed
+y_manual: list[float] = list(convolution_engine(x, h[::-1], 'valid'))
 
 print("Manual Convolution Result:", y_manual)
 
@@ -26,13 +26,9 @@ print(f"\n2. Defining Convolution Function")
 print(f"=======================================\n")
 ###################################################
 
-def convolution(_x: np.ndarray, _h: np.ndarray) -> list[float]:
-    """Perform discrete convolution of two 1D arrays using a manual implementation."""
-    y: list[float] = []
-    for i in range(len(_x) + len(_h) - 1):
-        y_i: float = sum(_h[j] * _x[i - j] for j in range(len(_h)) if 0 <= i - j < len(_x))
-        y.append(y_i)
-    return y
+def convolution(_x: np.ndarray, _h: np.ndarray) -> np.ndarray:
+    """Perform the full discrete convolution of two 1D arrays (direct, FFT or overlap-save/-add, by cost)."""
+    return convolution_engine(_x, _h, 'full')
 
 ###################################################
 print(f"\n3. Convolution with Impulse Signal")
@@ -63,7 +59,7 @@ t: np.ndarray = np.arange(N) / fs
 x_sine: np.ndarray = np.sin(2 * np.pi * f * t)
 
 # Apply Convolution
-y_sine: list[float] = convolution(x_sine, h_sine)
+y_sine: np.ndarray = convolution(x_sine, h_sine)
 
 plt.figure()
 plt.stem(x_sine)
@@ -131,6 +127,31 @@ plt.ylabel(r"Amplitude $y(n)$")
 plt.grid()
 plt.show()
 
+###################################################
+print(f"\n8. Convolution Engines on a Long Signal")
+print(f"=======================================\n")
+###################################################
+
+# 10 s at fs through a 1001-tap low-pass: every engine, and the one the cost model picks
+x_long: np.ndarray = np.random.normal(0, 1, 10 * fs)
+h_long: np.ndarray = firwin(1001, 0.1)
+print(f"Cost model choice for N = {len(x_long)}, L = {len(h_long)}: {COST_MODEL.choose(len(x_long), len(h_long))}")
+
+y_reference: np.ndarray = np.convolve(x_long, h_long)
+for method in CONVOLUTION_METHODS:
+    start: float = time.perf_counter()
+    y_method: np.ndarray = convolution_engine(x_long, h_long, 'full', method)
+    elapsed: float = time.perf_counter() - start
+    print(f"{method:>12}: {elapsed * 1e3:8.1f} ms, max error {np.abs(y_method - y_reference).max():.2e}")
+
+# Streaming overlap-save: blocks of any size in, as many filtered samples out, O(block) memory
+block_size: int = 4096
+streaming_filter = OverlapSave(h_long)
+y_stream: np.ndarray = np.concatenate([streaming_filter.process(x_long[i:i + block_size])
+                                       for i in range(0, len(x_long), block_size)])
+print(f"Streaming overlap-save (FFT block {streaming_filter.block}): "
+      f"max error vs lfilter {np.abs(y_stream - lfilter(h_long, 1, x_long)).max():.2e}")
+
 ###################################################
 print("\nSimulation complete!")
 print("=======================================\n")
@@ -1,9 +1,16 @@
 """ ex2.py """
 
+import os
+import sys
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.signal import windows
-from scipy.fft import fft, ifft, fftfreq, ifftshift
+from scipy.fft import ifft, fftfreq, ifftshift
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from spectrum import spectrum
+from fir_design import design_fir, design_fir_bank
 
 ###################################################
 print(f"\n1. Defining Parameters for FIR Filter")
@@ -86,6 +93,9 @@ print(f"=======================================\n")
 blackman_window: np.ndarray = windows.blackman(L)
 h_blackman: np.ndarray = h_truncated * blackman_window
 
+# Same taps in closed form (sinc instead of the N-point ifft of the ideal spectrum)
+print(f"Max difference to design_fir: {np.abs(h_blackman - design_fir(L, fc, fs)).max():.2e}")
+
 plt.figure()
 plt.plot(h_blackman,
          label=r'Blackman-Windowed $h(n)$', color='green')
@@ -101,10 +111,11 @@ print(f"\n6. Computing Frequency Response using FFT")
 print(f"=======================================\n")
 ###################################################
 
-H_blackman: np.ndarray = fft(h_blackman, N)
+# Real taps: the rfft half (0 to fs/2) holds the whole magnitude response
+freqs_half, H_blackman = spectrum(h_blackman, fs, N)
 
 plt.figure(figsize=(10, 6))
-plt.plot(freqs, np.abs(H_blackman),
+plt.plot(freqs_half, np.abs(H_blackman),
          label=r'Blackman Filter Magnitude Response')
 
 plt.title(r'Magnitude Response of Blackman-Windowed Filter')
@@ -119,23 +130,12 @@ print(f"\n7. Comparing Different Cutoff Frequencies")
 print(f"=======================================\n")
 ###################################################
 
-plt.figure(figsize=(10, 6))
-
-for fc in fcs:
-    H_ideal: np.ndarray = np.zeros(N)
-    cutoff_index: int = int(N * (fc / fs))
-    H_ideal[:cutoff_index] = 1
-    H_ideal[-cutoff_index:] = 1
+# Every cutoff designed at once, one row of taps (and of spectrum) per cutoff
+freqs_half, H_bank = spectrum(design_fir_bank(L, fcs, fs), fs, N)
 
-    h_ideal: np.ndarray = ifftshift(ifft(H_ideal))
-    h_ideal = np.real(h_ideal)
-    h_truncated: np.ndarray = h_ideal[start:end]
-
-    blackman_window: np.ndarray = windows.blackman(L)
-    h_blackman: np.ndarray = h_truncated * blackman_window
-
-    H_blackman: np.ndarray = fft(h_blackman, N)
-    plt.plot(freqs, np.abs(H_blackman),
+plt.figure(figsize=(10, 6))
+for fc, H_fc in zip(fcs, H_bank):
+    plt.plot(freqs_half, np.abs(H_fc),
              label=fr'Cutoff Frequency $f_c = {fc} \, \mathrm{{Hz}}$')
 
 plt.title(r'Magnitude Responses for Different Cutoff Frequencies')
@@ -145,6 +145,14 @@ plt.grid()
 plt.legend()
 plt.show()
 
+# Design sweep over many cutoffs
+fcs_sweep: np.ndarray = np.linspace(fs / 256, fs / 2, 500)
+start_time: float = time.perf_counter()
+h_sweep: np.ndarray = design_fir_bank(L, fcs_sweep, fs)
+elapsed: float = time.perf_counter() - start_time
+print(f"Designed {len(fcs_sweep)} low-pass filters of {L} taps in {elapsed * 1e3:.2f} ms "
+      f"({elapsed / len(fcs_sweep) * 1e6:.1f} us per filter)")
+
 ###################################################
 print("\nSimulation complete!")
 print("=======================================\n")
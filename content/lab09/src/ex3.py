@@ -1,8 +1,13 @@
 """ ex3.py """
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import firwin, lfilter, freqz
+from scipy.signal import firwin, freqz
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from filters import filter_bank
 
 ###################################################
 print(f"\n1. Defining Signal and Filter Parameters")
@@ -54,8 +59,8 @@ filters = {
     "High-pass Filter": firwin(steps, cutoff=0.75, pass_zero="highpass"),
 }
 
-filtered_signals = {name: [lfilter(b, 1, sine)[:len(t)]
-                           for sine in sines] for name, b in filters.items()}
+# Every filter over every test tone: (filters, tones, samples), one vectorised pass per filter
+filtered_signals = dict(zip(filters, filter_bank(list(filters.values()), np.array(sines))[..., :len(t)]))
 
 print("FIR Filters designed successfully.")
 
@@ -1,8 +1,13 @@
 """ ex4.py """
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import butter, cheby1, kaiserord, firwin, freqz, lfilter
+from scipy.signal import butter, cheby1, kaiserord, firwin, lfilter
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from freq_response import frequency_response, response_metrics
 
 ###################################################
 print("\n1. Defining Signal and Filter Parameters")
@@ -79,15 +84,23 @@ print("\n5. Visualizing Frequency Responses of Filters")
 print("=======================================\n")
 ###################################################
 
-def plot_frequency_response(_b: np.ndarray, _a: np.ndarray, _title: str) -> None:
-    """Plot frequency response of FIR/IIR filters."""
-    _w, _h = freqz(_b, _a, worN=8000)
-    plt.plot((_w / np.pi) * (fs / 2), 20 * np.log10(np.abs(_h)), label=_title)
+filter_titles: list[str] = ["FIR (Kaiser Window)", "IIR (Butterworth)", "IIR (Chebyshev Type I)"]
+
+# All three responses on one shared grid (as freqz(b, a, worN=8000) for each)
+freqs_response, H_response = frequency_response(
+    [fir_coeffs, (b_butter, a_butter), (b_cheby, a_cheby)], 8000, fs)
+
+# Passband up to 4 kHz (3 kHz tone), below the 11-tap FIR's transition band (-3 dB near 8 kHz);
+# stopband from 15 kHz (15 kHz tone) to fs / 2
+metrics = response_metrics(freqs_response, H_response, (0, 4000), [(15000, fs / 2)])
+for i, title in enumerate(filter_titles):
+    print(f"{title:>24}: passband ripple {metrics.passband_ripple[i]:5.2f} dB, "
+          f"stopband attenuation {metrics.stopband_attenuation[i]:5.1f} dB, "
+          f"-3 dB at {metrics.cutoff_high[i]:7.1f} Hz")
 
 plt.figure(figsize=(12, 8))
-plot_frequency_response(fir_coeffs, np.array([1]), "FIR (Kaiser Window)")
-plot_frequency_response(b_butter, a_butter, "IIR (Butterworth)")
-plot_frequency_response(b_cheby, a_cheby, "IIR (Chebyshev Type I)")
+for H, title in zip(H_response, filter_titles):
+    plt.plot(freqs_response, 20 * np.log10(np.abs(H)), label=title)
 plt.xlabel("Frequency (Hz)")
 plt.ylabel("Gain (dB)")
 plt.grid(True)
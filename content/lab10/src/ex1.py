@@ -1,9 +1,15 @@
 """ ex1.py """
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.fft import fft, ifft, fftfreq
-from scipy.signal import convolve, windows
+from scipy.signal import convolve
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from fir_design import design_fir, fir_window
+from freq_response import fir_response, response_metrics
 
 ###################################################
 print(f"\n1. Defining Parameters for FIR Filters")
@@ -91,8 +97,10 @@ print(f"\n6. Applying Blackman Window")
 print(f"=======================================\n")
 ###################################################
 
-blackman_window: np.ndarray = windows.blackman(L)
-h_blackman: np.ndarray = h_truncated * blackman_window
+# Truncated ideal response times the window, in closed form (cached per L, fc, fs, window)
+h_blackman: np.ndarray = design_fir(L, fc, fs)
+print(f"Max difference to the truncated ifft response times the window: "
+      f"{np.abs(h_blackman - h_truncated * fir_window(L)).max():.2e}")
 spectrum_blackman: np.ndarray = fft(h_blackman, N)
 
 plt.figure()
@@ -179,6 +187,31 @@ for i, f in enumerate(f_test):
     plt.grid()
     plt.show()
 
+###################################################
+print(f"\n10. Comparing the FIR Designs")
+print(f"=======================================\n")
+###################################################
+
+# All four designs at once: the same N // 2 bins as fft(h, N)[:N // 2] above
+fir_titles: list[str] = ["Truncated", "Blackman", "Band-pass", "High-pass"]
+freqs_response, H_response = fir_response(np.array([h_truncated, h_blackman, h_bandpass, h_highpass]), N // 2, fs)
+
+metrics = response_metrics(freqs_response, H_response[:2], (0, fc / 2), [(2 * fc, fs / 2)])
+for i, title in enumerate(fir_titles[:2]):
+    print(f"{title:>10}: passband ripple {metrics.passband_ripple[i]:.3f} dB, "
+          f"stopband attenuation {metrics.stopband_attenuation[i]:.1f} dB, "
+          f"-3 dB at {metrics.cutoff_high[i]:.4f} fs")
+
+plt.figure()
+for H, title in zip(H_response, fir_titles):
+    plt.plot(freqs_response, 20 * np.log10(np.abs(H) + 1e-10), label=title)
+plt.title(r"$\text{Magnitude Responses of the FIR Designs}$")
+plt.xlabel(r"$\text{Frequency (Hz)}$")
+plt.ylabel(r"$\text{Magnitude (dB)}$")
+plt.grid()
+plt.legend()
+plt.show()
+
 ###################################################
 print("\nSimulation complete!")
 print("=======================================\n")
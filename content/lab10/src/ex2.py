@@ -1,8 +1,14 @@
 """ ex2.py """
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import butter, lfilter, freqz
+from scipy.signal import butter
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "common"))
+from filters import filter_bank
+from freq_response import frequency_response, response_metrics
 
 ###################################################
 print(f"\n1. Defining Signal and Filter Parameters")
@@ -47,9 +53,9 @@ print(f"\n3. Applying Filters to Test Signals")
 print(f"=======================================\n")
 ###################################################
 
-filtered_sines_low = [lfilter(b_low, a_low, sine)[:len(t)] for sine in sines]
-filtered_sines_high = [lfilter(b_high, a_high, sine)[:len(t)] for sine in sines]
-filtered_sines_band = [lfilter(b_band, a_band, sine)[:len(t)] for sine in sines]
+# The three filters over all test tones at once: (filters, tones, samples)
+filtered_sines_low, filtered_sines_high, filtered_sines_band = filter_bank(
+    [(b_low, a_low), (b_high, a_high), (b_band, a_band)], np.array(sines))[..., :len(t)]
 
 ###################################################
 print(f"\n4. Visualizing Filtered Signals")
@@ -82,9 +88,8 @@ print(f"\n5. Visualizing Frequency Response of Filters")
 print(f"=======================================\n")
 ###################################################
 
-def plot_frequency_response(_b: np.ndarray, _a: np.ndarray, _title: str):
+def plot_frequency_response(_freq: np.ndarray, _H: np.ndarray, _title: str):
     """Plot frequency response of a given filter."""
-    _freq, _H = freqz(_b, _a, fs=fs)
     plt.figure(figsize=(10, 5))
     plt.plot(_freq, 20 * np.log10(abs(_H) + 1e-10), label=r"$|H(f)|$")
     plt.title(f'Digital Filter Frequency Response - {_title}')
@@ -94,10 +99,23 @@ def plot_frequency_response(_b: np.ndarray, _a: np.ndarray, _title: str):
     plt.legend()
     plt.show()
 
+# The three responses in one pass on freqz's default 512-point grid
+freqs_response, H_response = frequency_response([(b_low, a_low), (b_band, a_band), (b_high, a_high)], 512, fs)
+
+# Each filter's passband (10% inside its cutoffs) and stopbands (below half / above 1.5-2x its cutoffs)
+filter_titles: list[str] = ["Low-pass Filter", "Band-pass Filter", "High-pass Filter"]
+passbands: list[tuple[float, float]] = [
+    (0, 0.5 * low_cutoff), (1.1 * band_cutoff[0], 0.9 * band_cutoff[1]), (1.1 * high_cutoff, fs / 2)]
+stopbands: list[list[tuple[float, float]]] = [
+    [(2 * low_cutoff, fs / 2)], [(0, 0.5 * band_cutoff[0]), (1.5 * band_cutoff[1], fs / 2)], [(0, 0.5 * high_cutoff)]]
+metrics = response_metrics(freqs_response, H_response, passbands, stopbands)
+
 # Plot frequency responses for all filters
-for b, a, title in zip([b_low, b_band, b_high], [a_low, a_band, a_high],
-                        ["Low-pass Filter", "Band-pass Filter", "High-pass Filter"]):
-    plot_frequency_response(b, a, title)
+for i, title in enumerate(filter_titles):
+    print(f"{title:>16}: passband ripple {metrics.passband_ripple[i]:.3f} dB, "
+          f"stopband attenuation {metrics.stopband_attenuation[i]:.1f} dB, "
+          f"-3 dB band {metrics.cutoff_low[i]:.0f} - {metrics.cutoff_high[i]:.0f} Hz")
+    plot_frequency_response(freqs_response, H_response[i], title)
 
 ###################################################
 print("\nSimulation complete!")